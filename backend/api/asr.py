@@ -3,49 +3,70 @@ ASR endpoints for speech-to-text conversion
 """
 
 import time
+from typing import Optional
 
 import structlog
+from core.cache import redis_cached
 from core.config import settings
-from fastapi import APIRouter, Depends, HTTPException, Request
-from schemas.asr import ASRData, ASRMetadata, ASRRequest, ASRResponse
+from core.responses import (
+    STATIC_CACHE_CONTROL,
+    ModelJSONResponse,
+    etag_response,
+    static_json,
+)
+from fastapi import APIRouter, HTTPException, Request
+from schemas.asr import ASRData, ASRRequest, ASRResponse, build_asr_response
 from services.asr_service import ASRService
 
 router = APIRouter()
 logger = structlog.get_logger()
 
 
-async def get_asr_service(request: Request) -> ASRService:
-    """Get ASR service instance"""
-    return request.app.state.model_manager.asr_service
+# Bound once from the app lifespan; the endpoint reads it without Depends
+_asr_service: Optional[ASRService] = None
 
 
-@router.post("/transcribe")
-async def transcribe_audio(
-    request: ASRRequest, asr_service: ASRService = Depends(get_asr_service)
-):
+def bind(model_manager) -> None:
+    """Bind the ASR service used by this router"""
+    global _asr_service
+    _asr_service = model_manager.asr_service
+
+
+def _asr_cache_key(request: ASRRequest) -> bytes:
+    source = request.audio_source
+    if isinstance(source, str):
+        source = source.encode()
+    params = f"|{request.language}|{request.model_type}|{request.timestamp}"
+    return source + params.encode()
+
+
+@router.post("/transcribe", response_model=ASRResponse)
+@redis_cached(
+    prefix="asr:transcribe", ttl=settings.LONG_CACHE_TTL, key_fn=_asr_cache_key
+)
+async def transcribe_audio(request: ASRRequest):
     """Transcribe audio to text using ASR"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     try:
-        logger.info(
-            "ASR request received", language=request.language, model=request.model_type
+        structlog.contextvars.bind_contextvars(
+            language=request.language, model=request.model_type
         )
+        logger.info("ASR request received")
 
-        result = await asr_service.transcribe(
+        result = await _asr_service.transcribe(
             audio_source=request.audio_source,
             language=request.language,
             model_type=request.model_type,
             timestamp=request.timestamp,
         )
 
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
 
-        metadata = ASRMetadata(
-            processing_time_ms=processing_time, asr_engine=request.model_type
+        response = ModelJSONResponse(
+            build_asr_response(result, processing_time, asr_engine=request.model_type)
         )
 
-        response = ASRResponse(data=result.dict(), metadata=metadata.dict())
-
         logger.info(
             "ASR completed successfully",
             processing_time_ms=processing_time,
@@ -59,22 +80,25 @@ async def transcribe_audio(
         raise HTTPException(status_code=500, detail=f"ASR failed: {str(e)}")
 
 
-@router.get("/models")
-async def list_available_models():
-    """List available ASR models"""
-    return {
+_ASR_MODELS = static_json(
+    {
         "models": [
             {"id": "whisper", "name": "OpenAI Whisper", "type": "multilingual"},
             {"id": "wav2vec", "name": "Facebook Wav2Vec", "type": "multilingual"},
             {"id": "conformer", "name": "Conformer ASR", "type": "multilingual"},
         ]
     }
+)
 
 
-@router.get("/languages")
-async def list_supported_languages():
-    """List supported ASR languages"""
-    return {
+@router.get("/models")
+async def list_available_models(request: Request):
+    """List available ASR models"""
+    return etag_response(request, *_ASR_MODELS, STATIC_CACHE_CONTROL)
+
+
+_ASR_LANGUAGES = static_json(
+    {
         "languages": [
             {"code": "vi", "name": "Vietnamese", "primary": True},
             {"code": "en", "name": "English"},
@@ -83,3 +107,10 @@ async def list_supported_languages():
             {"code": "ko", "name": "Korean"},
         ]
     }
+)
+
+
+@router.get("/languages")
+async def list_supported_languages(request: Request):
+    """List supported ASR languages"""
+    return etag_response(request, *_ASR_LANGUAGES, STATIC_CACHE_CONTROL)
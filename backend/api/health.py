@@ -2,17 +2,46 @@
 Health check endpoints
 """
 
+import asyncio
 import time
+from typing import Any, Dict
 
 import psutil
 import structlog
 from core.config import settings
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from core.responses import ModelJSONResponse
+from fastapi import APIRouter, Depends, FastAPI, Request
 
 router = APIRouter()
 logger = structlog.get_logger()
 
+_BOOT_TIME = psutil.boot_time()
+
+# Prime the CPU counter so the first non-blocking sample is meaningful
+psutil.cpu_percent(interval=None)
+
+
+def _read_system_metrics() -> Dict[str, Any]:
+    """Collect system metrics without blocking on a CPU sampling interval"""
+    return {
+        "cpu_percent": psutil.cpu_percent(interval=None),
+        "memory_percent": psutil.virtual_memory().percent,
+        "disk_percent": psutil.disk_usage("/").percent,
+    }
+
+
+async def sample_system_metrics(app: FastAPI) -> None:
+    """Refresh ``app.state.sys_metrics`` in the background for health probes"""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            app.state.sys_metrics = await loop.run_in_executor(
+                None, _read_system_metrics
+            )
+        except Exception as e:
+            logger.warning("System metrics sampling failed", error=str(e))
+        await asyncio.sleep(settings.HEALTH_SAMPLE_INTERVAL)
+
 
 @router.get("/")
 async def health_check():
@@ -25,13 +54,13 @@ async def health_check():
 
 
 @router.get("/detailed")
-async def detailed_health_check():
+async def detailed_health_check(request: Request):
     """Detailed health check with system metrics"""
     try:
-        # System metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage("/")
+        # System metrics, sampled in the background by the app lifespan
+        metrics = getattr(request.app.state, "sys_metrics", None)
+        if metrics is None:
+            metrics = _read_system_metrics()
 
         # Service status
         service_status = {
@@ -39,12 +68,7 @@ async def detailed_health_check():
             "timestamp": time.time(),
             "service": "mm-data-intelligent-agent-backend",
             "version": "2.0.0",
-            "system": {
-                "cpu_percent": cpu_percent,
-                "memory_percent": memory.percent,
-                "disk_percent": disk.percent,
-                "uptime": time.time() - psutil.boot_time(),
-            },
+            "system": {**metrics, "uptime": time.time() - _BOOT_TIME},
         }
 
         logger.info("Health check completed", **service_status)
@@ -52,16 +76,24 @@ async def detailed_health_check():
 
     except Exception as e:
         logger.error("Health check failed", error=str(e))
-        return JSONResponse(
+        return ModelJSONResponse(
             status_code=500,
             content={"status": "unhealthy", "error": str(e), "timestamp": time.time()},
         )
 
 
 @router.get("/ready")
-async def readiness_check():
+async def readiness_check(request: Request):
     """Readiness check for Kubernetes"""
     try:
+        # Not ready while startup warmup is still loading models
+        warmup_task = getattr(request.app.state, "warmup_task", None)
+        if warmup_task is not None and not warmup_task.done():
+            return ModelJSONResponse(
+                status_code=503,
+                content={"status": "warming_up", "timestamp": time.time()},
+            )
+
         # Check if models are loaded (if lazy loading is disabled)
         if not settings.LAZY_LOAD_MODELS:
             # Add model availability checks here
@@ -70,7 +102,7 @@ async def readiness_check():
         return {"status": "ready", "timestamp": time.time()}
     except Exception as e:
         logger.error("Readiness check failed", error=str(e))
-        return JSONResponse(
+        return ModelJSONResponse(
             status_code=503,
             content={"status": "not_ready", "error": str(e), "timestamp": time.time()},
         )
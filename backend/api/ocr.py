@@ -3,43 +3,63 @@ OCR endpoints for text extraction from images
 """
 
 import time
+from typing import Optional
 
 import structlog
+from core.cache import redis_cached
 from core.config import settings
-from fastapi import APIRouter, Depends, HTTPException, Request
-from schemas.ocr import OCRData, OCRMetadata, OCRRequest, OCRResponse
+from core.responses import (
+    STATIC_CACHE_CONTROL,
+    ModelJSONResponse,
+    etag_response,
+    static_json,
+)
+from fastapi import APIRouter, HTTPException, Request
+from schemas.ocr import OCRData, OCRRequest, OCRResponse, build_ocr_response
 from services.ocr_service import OCRService
 
 router = APIRouter()
 logger = structlog.get_logger()
 
 
-async def get_ocr_service(request: Request) -> OCRService:
-    """Get OCR service instance"""
-    return request.app.state.model_manager.ocr_service
+# Bound once from the app lifespan; the endpoint reads it without Depends
+_ocr_service: Optional[OCRService] = None
 
 
-@router.post("/extract")
-async def extract_text(
-    request: OCRRequest, ocr_service: OCRService = Depends(get_ocr_service)
-):
+def bind(model_manager) -> None:
+    """Bind the OCR service used by this router"""
+    global _ocr_service
+    _ocr_service = model_manager.ocr_service
+
+
+def _ocr_cache_key(request: OCRRequest) -> bytes:
+    source = request.image_source
+    if isinstance(source, str):
+        source = source.encode()
+    return source + f"|{request.language}|{request.confidence_threshold}".encode()
+
+
+@router.post("/extract", response_model=OCRResponse)
+@redis_cached(prefix="ocr:extract", ttl=settings.LONG_CACHE_TTL, key_fn=_ocr_cache_key)
+async def extract_text(request: OCRRequest):
     """Extract text from image using OCR"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     try:
-        logger.info("OCR request received", language=request.language)
+        structlog.contextvars.bind_contextvars(language=request.language)
+        logger.info("OCR request received")
 
-        result = await ocr_service.extract_text(
+        result = await _ocr_service.extract_text(
             image_source=request.image_source,
             language=request.language,
             confidence_threshold=request.confidence_threshold,
         )
 
-        processing_time = (time.time() - start_time) * 1000
-
-        metadata = OCRMetadata(processing_time_ms=processing_time, ocr_engine="default")
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
 
-        response = OCRResponse(data=result.dict(), metadata=metadata.dict())
+        response = ModelJSONResponse(
+            build_ocr_response(result, processing_time, ocr_engine="default")
+        )
 
         logger.info(
             "OCR completed successfully",
@@ -54,10 +74,8 @@ async def extract_text(
         raise HTTPException(status_code=500, detail=f"OCR failed: {str(e)}")
 
 
-@router.get("/languages")
-async def list_supported_languages():
-    """List supported OCR languages"""
-    return {
+_OCR_LANGUAGES = static_json(
+    {
         "languages": [
             {"code": "en", "name": "English"},
             {"code": "vi", "name": "Vietnamese"},
@@ -66,3 +84,10 @@ async def list_supported_languages():
             {"code": "ko", "name": "Korean"},
         ]
     }
+)
+
+
+@router.get("/languages")
+async def list_supported_languages(request: Request):
+    """List supported OCR languages"""
+    return etag_response(request, *_OCR_LANGUAGES, STATIC_CACHE_CONTROL)
@@ -3,66 +3,81 @@ Search endpoints for text, image, and visual search
 """
 
 import time
-from typing import List
+from typing import AsyncIterator, List, Optional
 
+import orjson
 import structlog
+from core.batching import BatchedDispatcher
+from core.cache import mark_degraded, redis_cached
 from core.config import settings
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse
+from core.metadata_cache import metadata_cache
+from core.responses import (
+    STATIC_CACHE_CONTROL,
+    ModelJSONResponse,
+    etag_response,
+    static_json,
+)
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from schemas.common import SearchResult
 from schemas.search import (
     ImageSearchRequest,
     NeighborSearchRequest,
-    SearchMetadata,
     SearchResponse,
     TextSearchRequest,
     VisualSearchRequest,
+    build_search_response,
 )
 from services.search_service import SearchService
 
 router = APIRouter()
 logger = structlog.get_logger()
 
+_METADATA_CACHE_CONTROL = f"max-age={settings.METADATA_CACHE_MAX_AGE}"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+# Bound once from the app lifespan; endpoints read them without Depends
+_search_service: Optional[SearchService] = None
+_text_search_dispatcher: Optional[BatchedDispatcher] = None
 
-async def get_search_service(request: Request) -> SearchService:
-    """Get search service instance"""
-    return await request.app.state.model_manager.get_search_service()
 
+def bind(model_manager) -> None:
+    """Bind the search service and text search dispatcher used by this router"""
+    global _search_service, _text_search_dispatcher
+    _search_service = model_manager.search_service
+    _text_search_dispatcher = model_manager.text_search_dispatcher
 
-@router.post("/text")
-async def text_search(
-    request: TextSearchRequest,
-    search_service: SearchService = Depends(get_search_service),
-):
+
+@router.post("/text", response_model=SearchResponse)
+@redis_cached(
+    prefix="search:text",
+    ttl=settings.CACHE_TTL,
+    key_fn=lambda r: f"{r.query}|{r.model_type.value}|{r.limit}",
+)
+async def text_search(request: TextSearchRequest):
     """Text-based search endpoint"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     try:
-        logger.info(
-            "Text search request", query=request.query, model=request.model_type
+        structlog.contextvars.bind_contextvars(
+            query=request.query, model=request.model_type.value
         )
+        logger.info("Text search request")
 
-        results = await search_service.text_search(
-            query=request.query, model_type=request.model_type, limit=request.limit
-        )
-
-        processing_time = (time.time() - start_time) * 1000
+        results = await _text_search_dispatcher.submit(request)
 
-        metadata = SearchMetadata(
-            total_results=len(results),
-            query_time_ms=processing_time,
-            model_used=str(request.model_type),
-            search_type="text",
-        )
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
 
-        response = SearchResponse(
-            data={"results": [result.dict() for result in results]},
-            metadata=metadata.dict(),
+        response = ModelJSONResponse(
+            build_search_response(
+                results, processing_time, request.model_type.value, "text"
+            )
         )
+        mark_degraded(response, results)
 
         logger.info(
             "Text search completed",
-            query=request.query,
             results_count=len(results),
             processing_time_ms=processing_time,
         )
@@ -70,40 +85,38 @@ async def text_search(
         return response
 
     except Exception as e:
-        logger.error("Text search failed", query=request.query, error=str(e))
+        logger.error("Text search failed", error=str(e))
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
-@router.post("/image")
-async def image_search(
-    request: ImageSearchRequest,
-    search_service: SearchService = Depends(get_search_service),
-):
+@router.post("/image", response_model=SearchResponse)
+@redis_cached(
+    prefix="search:image",
+    ttl=settings.CACHE_TTL,
+    key_fn=lambda r: f"{r.image_source}|{r.model_type.value}|{r.limit}",
+)
+async def image_search(request: ImageSearchRequest):
     """Image-based search endpoint"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     try:
-        logger.info("Image search request", model=request.model_type)
+        structlog.contextvars.bind_contextvars(model=request.model_type.value)
+        logger.info("Image search request")
 
-        results = await search_service.image_search(
+        results = await _search_service.image_search(
             image_source=request.image_source,
             model_type=request.model_type,
             limit=request.limit,
         )
 
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
 
-        metadata = SearchMetadata(
-            total_results=len(results),
-            query_time_ms=processing_time,
-            model_used=str(request.model_type),
-            search_type="image",
-        )
-
-        response = SearchResponse(
-            data={"results": [result.dict() for result in results]},
-            metadata=metadata.dict(),
+        response = ModelJSONResponse(
+            build_search_response(
+                results, processing_time, request.model_type.value, "image"
+            )
         )
+        mark_degraded(response, results)
 
         logger.info(
             "Image search completed",
@@ -118,42 +131,34 @@ async def image_search(
         raise HTTPException(status_code=500, detail=f"Image search failed: {str(e)}")
 
 
-@router.post("/visual")
-async def visual_search(
-    request: VisualSearchRequest,
-    search_service: SearchService = Depends(get_search_service),
-):
+@router.post("/visual", response_model=SearchResponse)
+async def visual_search(request: VisualSearchRequest):
     """Visual search with object detection endpoint"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     try:
+        structlog.contextvars.bind_contextvars(model=request.model_type.value)
         logger.info(
             "Visual search request",
             object_count=len(request.object_list),
             logic=request.logic,
-            model=request.model_type,
         )
 
-        results = await search_service.visual_search(
+        results = await _search_service.visual_search(
             object_list=request.object_list,
             logic=request.logic,
             model_type=request.model_type,
             limit=request.limit,
         )
 
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
 
-        metadata = SearchMetadata(
-            total_results=len(results),
-            query_time_ms=processing_time,
-            model_used=str(request.model_type),
-            search_type="visual",
-        )
-
-        response = SearchResponse(
-            data={"results": [result.dict() for result in results]},
-            metadata=metadata.dict(),
+        response = ModelJSONResponse(
+            build_search_response(
+                results, processing_time, request.model_type.value, "visual"
+            )
         )
+        mark_degraded(response, results)
 
         logger.info(
             "Visual search completed",
@@ -168,44 +173,39 @@ async def visual_search(
         raise HTTPException(status_code=500, detail=f"Visual search failed: {str(e)}")
 
 
-@router.post("/neighbor")
-async def neighbor_search(
-    request: NeighborSearchRequest,
-    search_service: SearchService = Depends(get_search_service),
-):
+@router.post("/neighbor", response_model=SearchResponse)
+@redis_cached(
+    prefix="search:neighbor",
+    ttl=settings.CACHE_TTL,
+    key_fn=lambda r: f"{r.image_id}|{r.model_type.value}|{r.limit}",
+)
+async def neighbor_search(request: NeighborSearchRequest):
     """Similar image search endpoint"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     try:
-        logger.info(
-            "Neighbor search request",
-            image_id=request.image_id,
-            model=request.model_type,
+        structlog.contextvars.bind_contextvars(
+            image_id=request.image_id, model=request.model_type.value
         )
+        logger.info("Neighbor search request")
 
-        results = await search_service.neighbor_search(
+        results = await _search_service.neighbor_search(
             image_id=request.image_id,
             model_type=request.model_type,
             limit=request.limit,
         )
 
-        processing_time = (time.time() - start_time) * 1000
-
-        metadata = SearchMetadata(
-            total_results=len(results),
-            query_time_ms=processing_time,
-            model_used=str(request.model_type),
-            search_type="neighbor",
-        )
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
 
-        response = SearchResponse(
-            data={"results": [result.dict() for result in results]},
-            metadata=metadata.dict(),
+        response = ModelJSONResponse(
+            build_search_response(
+                results, processing_time, request.model_type.value, "neighbor"
+            )
         )
+        mark_degraded(response, results)
 
         logger.info(
             "Neighbor search completed",
-            image_id=request.image_id,
             results_count=len(results),
             processing_time_ms=processing_time,
         )
@@ -213,14 +213,12 @@ async def neighbor_search(
         return response
 
     except Exception as e:
-        logger.error("Neighbor search failed", image_id=request.image_id, error=str(e))
+        logger.error("Neighbor search failed", error=str(e))
         raise HTTPException(status_code=500, detail=f"Neighbor search failed: {str(e)}")
 
 
-@router.get("/models")
-async def list_available_models():
-    """List available search models"""
-    return {
+_SEARCH_MODELS = static_json(
+    {
         "models": [
             {"id": "clip", "name": "CLIP ViT-B/32", "type": "image_text"},
             {"id": "longclip", "name": "Long-CLIP", "type": "image_text"},
@@ -228,29 +226,39 @@ async def list_available_models():
             {"id": "beit3", "name": "BEiT-3", "type": "image_text"},
         ]
     }
+)
+
+
+@router.get("/models")
+async def list_available_models(request: Request):
+    """List available search models"""
+    return etag_response(request, *_SEARCH_MODELS, STATIC_CACHE_CONTROL)
+
+
+def _require_metadata_service():
+    """The initialized metadata service, or a 503 while it is unavailable"""
+    metadata_service = _search_service._metadata_service
+    if not metadata_service or not metadata_service.is_initialized():
+        raise HTTPException(status_code=503, detail="Metadata service not available")
+    return metadata_service
 
 
 @router.get("/metadata/video/{video_id}")
-async def get_video_metadata(
-    video_id: str,
-    search_service: SearchService = Depends(get_search_service),
-):
+async def get_video_metadata(video_id: str, request: Request):
     """Get detailed metadata for a specific video"""
     try:
         logger.info(f"Video metadata request for: {video_id}")
 
-        # Get metadata service from search service
-        metadata_service = search_service._metadata_service
-        if not metadata_service or not metadata_service.is_initialized():
-            raise HTTPException(
-                status_code=503, detail="Metadata service not available"
-            )
+        metadata_service = _require_metadata_service()
 
-        video_summary = metadata_service.get_video_summary(video_id)
-        if not video_summary:
+        cached = metadata_cache.get_or_build(
+            f"video:{video_id}", lambda: metadata_service.get_video_summary(video_id)
+        )
+        if not cached:
             raise HTTPException(status_code=404, detail=f"Video {video_id} not found")
 
-        return JSONResponse(content=video_summary)
+        content, etag = cached
+        return etag_response(request, content, etag, _METADATA_CACHE_CONTROL)
 
     except HTTPException:
         raise
@@ -262,26 +270,18 @@ async def get_video_metadata(
 
 
 @router.get("/metadata/frame/{frame_id}")
-async def get_frame_metadata(
-    frame_id: str,
-    search_service: SearchService = Depends(get_search_service),
-):
+async def get_frame_metadata(frame_id: str):
     """Get detailed metadata for a specific frame"""
     try:
         logger.info(f"Frame metadata request for: {frame_id}")
 
-        # Get metadata service from search service
-        metadata_service = search_service._metadata_service
-        if not metadata_service or not metadata_service.is_initialized():
-            raise HTTPException(
-                status_code=503, detail="Metadata service not available"
-            )
+        metadata_service = _require_metadata_service()
 
         frame_metadata = metadata_service.get_frame_metadata(frame_id)
         if not frame_metadata:
             raise HTTPException(status_code=404, detail=f"Frame {frame_id} not found")
 
-        return JSONResponse(content=frame_metadata)
+        return ModelJSONResponse(frame_metadata)
 
     except HTTPException:
         raise
@@ -293,23 +293,17 @@ async def get_frame_metadata(
 
 
 @router.get("/metadata/videos")
-async def get_all_videos(
-    search_service: SearchService = Depends(get_search_service),
-):
+async def get_all_videos(request: Request):
     """Get list of all available videos"""
     try:
         logger.info("All videos metadata request")
 
-        # Get metadata service from search service
-        metadata_service = search_service._metadata_service
-        if not metadata_service or not metadata_service.is_initialized():
-            raise HTTPException(
-                status_code=503, detail="Metadata service not available"
-            )
-
-        videos = metadata_service.get_all_videos()
+        metadata_service = _require_metadata_service()
 
-        return JSONResponse(content={"videos": videos})
+        content, etag = metadata_cache.get_or_build(
+            "videos", lambda: {"videos": metadata_service.get_all_videos()}
+        )
+        return etag_response(request, content, etag, _METADATA_CACHE_CONTROL)
 
     except HTTPException:
         raise
@@ -320,32 +314,72 @@ async def get_all_videos(
         )
 
 
+async def _stream_frames(
+    metadata_service, video_id: str, limit: int
+) -> AsyncIterator[bytes]:
+    """Encode a frame listing incrementally, one chunk per batch of frames"""
+    yield b'{"video_id":' + orjson.dumps(video_id) + b',"frames":['
+    chunk = []
+    count = 0
+    for frame in metadata_service.iter_frames_by_video(video_id, limit):
+        chunk.append(orjson.dumps(frame))
+        count += 1
+        if len(chunk) >= settings.FRAMES_STREAM_CHUNK:
+            yield (b"," if count > len(chunk) else b"") + b",".join(chunk)
+            chunk = []
+    if chunk:
+        yield (b"," if count > len(chunk) else b"") + b",".join(chunk)
+    yield b'],"total_frames":' + str(count).encode() + b"}"
+
+
+async def _stream_frames_ndjson(
+    metadata_service, video_id: str, limit: int
+) -> AsyncIterator[bytes]:
+    """Encode a frame listing as NDJSON, one line per frame"""
+    chunk = []
+    for frame in metadata_service.iter_frames_by_video(video_id, limit):
+        chunk.append(orjson.dumps(frame, option=orjson.OPT_APPEND_NEWLINE))
+        if len(chunk) >= settings.FRAMES_STREAM_CHUNK:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+
 @router.get("/metadata/video/{video_id}/frames")
-async def get_video_frames(
-    video_id: str,
-    limit: int = 100,
-    search_service: SearchService = Depends(get_search_service),
-):
+async def get_video_frames(video_id: str, request: Request, limit: int = 100):
     """Get all frames for a specific video"""
     try:
         logger.info(f"Video frames request for: {video_id}, limit: {limit}")
 
-        # Get metadata service from search service
-        metadata_service = search_service._metadata_service
-        if not metadata_service or not metadata_service.is_initialized():
-            raise HTTPException(
-                status_code=503, detail="Metadata service not available"
+        metadata_service = _require_metadata_service()
+
+        if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+            # Clients asking for NDJSON get one frame per line, streamed
+            return StreamingResponse(
+                _stream_frames_ndjson(metadata_service, video_id, limit),
+                media_type=NDJSON_MEDIA_TYPE,
             )
 
-        frames = metadata_service.search_frames_by_video(video_id, limit)
+        if limit > settings.FRAMES_STREAM_THRESHOLD:
+            # Large listings are streamed instead of cached whole
+            return StreamingResponse(
+                _stream_frames(metadata_service, video_id, limit),
+                media_type="application/json",
+            )
 
-        return JSONResponse(
-            content={
+        def build_frames():
+            frames = metadata_service.search_frames_by_video(video_id, limit)
+            return {
                 "video_id": video_id,
                 "frames": frames,
                 "total_frames": len(frames),
             }
+
+        content, etag = metadata_cache.get_or_build(
+            f"frames:{video_id}:{limit}", build_frames
         )
+        return etag_response(request, content, etag, _METADATA_CACHE_CONTROL)
 
     except HTTPException:
         raise
@@ -0,0 +1,148 @@
+"""
+Server-side micro-batching for model-backed endpoints
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+BatchFn = Callable[[List[Any]], Awaitable[List[Any]]]
+
+
+class BatchedDispatcher:
+    """
+    Groups concurrent requests into a single batched call.
+
+    Callers ``await dispatcher.submit(payload)``; a background worker collects
+    payloads for up to ``max_wait_ms`` (or until ``max_batch_size`` is reached)
+    and hands them to ``batch_fn``, which must return one result per payload
+    in the same order. A result that is an exception is raised in that
+    caller only, so ``batch_fn`` can fail one group without failing the rest.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 50.0,
+        name: str = "dispatcher",
+    ):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: List[Tuple[Any, asyncio.Future]] = []
+
+    @property
+    def running(self) -> bool:
+        """Whether the background worker is running"""
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        """Start the background worker"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run(), name=f"batch-{self._name}")
+        logger.info(
+            "Batched dispatcher started",
+            dispatcher=self._name,
+            max_batch_size=self._max_batch_size,
+            max_wait_ms=self._max_wait * 1000.0,
+        )
+
+    async def stop(self) -> None:
+        """Stop the worker and fail any requests still waiting"""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        pending = self._inflight
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self._name} stopped"))
+        self._inflight = []
+
+    async def submit(self, payload: Any) -> Any:
+        """Queue a payload and wait for its slice of the batched result"""
+        if not self.running:
+            # Not started (e.g. lifespan skipped): run as a batch of one
+            (result,) = await self._batch_fn([payload])
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Block for the first item, then gather more until the window closes"""
+        # Collect straight into _inflight so stop() can fail a partial batch
+        batch = self._inflight = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._max_wait
+
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        """Worker loop: collect, dispatch, and resolve waiters"""
+        while True:
+            batch = await self._collect()
+            payloads = [payload for payload, _ in batch]
+
+            try:
+                results = await self._batch_fn(payloads)
+                if len(results) != len(payloads):
+                    raise RuntimeError(
+                        f"{self._name} returned {len(results)} results "
+                        f"for {len(payloads)} requests"
+                    )
+            except Exception as e:
+                logger.error(
+                    "Batched dispatch failed", dispatcher=self._name, error=str(e)
+                )
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._inflight = []
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            self._inflight = []
+
+
+def group_indices(payloads: List[Any], key_fn: Callable[[Any], Any]) -> dict:
+    """Group payload positions by key so each group can share one batched call"""
+    groups = {}
+    for i, payload in enumerate(payloads):
+        groups.setdefault(key_fn(payload), []).append(i)
+    return groups
@@ -0,0 +1,173 @@
+"""
+Redis read-through cache for model-backed endpoint responses
+"""
+
+import functools
+import hashlib
+from typing import Any, Callable, Optional, Union
+
+import orjson
+import structlog
+from cachetools import TLRUCache
+from core.config import settings
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is optional at runtime
+    aioredis = None
+
+logger = structlog.get_logger()
+
+# Set by endpoints on responses built from fallback data, which are not cached
+DEGRADED_HEADER = "X-Degraded"
+
+
+def is_degraded(result: Any) -> bool:
+    """Whether a service returned fallback data (e.g. ``FallbackResults``)"""
+    return getattr(result, "degraded", False)
+
+
+def mark_degraded(response: Response, result: Any) -> Response:
+    """Flag ``response`` with ``X-Degraded`` if ``result`` is fallback data"""
+    if is_degraded(result):
+        response.headers[DEGRADED_HEADER] = "true"
+    return response
+
+
+class ResultCache:
+    """
+    Two-tier result cache: a small in-process LRU in front of Redis.
+
+    Repeated queries are answered from process memory without a Redis round
+    trip; Redis shares entries across workers. Without Redis the local tier
+    still serves hits, and with both tiers off the cache is a no-op.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._local: Optional[TLRUCache] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None or self._local is not None
+
+    async def connect(self) -> None:
+        """Set up the local tier and connect to Redis if it is reachable"""
+        if not settings.CACHE_ENABLED:
+            logger.info("Result cache disabled")
+            return
+        if settings.RESULT_CACHE_LOCAL_SIZE > 0:
+            # Entries are stored as (bytes, ttl) so each expires on its own TTL
+            self._local = TLRUCache(
+                maxsize=settings.RESULT_CACHE_LOCAL_SIZE,
+                ttu=lambda _key, value, now: now + value[1],
+            )
+        if aioredis is None:
+            logger.warning("redis package not installed, Redis result cache disabled")
+            return
+
+        client = aioredis.from_url(settings.REDIS_URL, decode_responses=False)
+        try:
+            await client.ping()
+        except Exception as e:
+            logger.warning(
+                "Redis unavailable, Redis result cache disabled", error=str(e)
+            )
+            await client.aclose()
+            return
+
+        self._client = client
+        logger.info("Result cache connected", url=settings.REDIS_URL)
+
+    async def close(self) -> None:
+        self._local = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if self._local is not None:
+            entry = self._local.get(key)
+            if entry is not None:
+                return entry[0]
+        if self._client is None:
+            return None
+        try:
+            return await self._client.get(key)
+        except Exception as e:
+            logger.warning("Result cache read failed", key=key, error=str(e))
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        if self._local is not None:
+            self._local[key] = (value, ttl)
+        if self._client is None:
+            return
+        try:
+            await self._client.set(key, value, ex=ttl)
+        except Exception as e:
+            logger.warning("Result cache write failed", key=key, error=str(e))
+
+
+# Global result cache instance
+result_cache = ResultCache()
+
+
+def make_cache_key(prefix: str, raw: Union[str, bytes]) -> str:
+    """Build a versioned cache key from a normalized request payload"""
+    if isinstance(raw, str):
+        raw = raw.encode()
+    digest = hashlib.sha256(raw).hexdigest()
+    return f"{prefix}:{settings.CACHE_KEY_VERSION}:{digest}"
+
+
+def redis_cached(
+    prefix: str, ttl: int, key_fn: Callable[[Any], Union[str, bytes]]
+) -> Callable:
+    """
+    Cache an endpoint's JSON response in Redis.
+
+    ``key_fn`` receives the endpoint's ``request`` body model and returns the
+    normalized payload to hash. Hits are served as prebuilt bytes, skipping the
+    service call and response serialization; ``X-Cache`` reports HIT/MISS.
+    Responses flagged with ``X-Degraded`` (fallback data) are never stored.
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            if not result_cache.enabled:
+                return await endpoint(*args, **kwargs)
+
+            key = make_cache_key(prefix, key_fn(kwargs["request"]))
+            cached = await result_cache.get(key)
+            if cached is not None:
+                return Response(
+                    content=cached,
+                    media_type="application/json",
+                    headers={"X-Cache": "HIT"},
+                )
+
+            response = await endpoint(*args, **kwargs)
+            if isinstance(response, Response):
+                # Prebuilt responses (e.g. ORJSONResponse) already hold the bytes
+                if response.status_code == 200:
+                    if DEGRADED_HEADER not in response.headers:
+                        await result_cache.set(key, response.body, ttl)
+                    response.headers["X-Cache"] = "MISS"
+                return response
+
+            content = orjson.dumps(jsonable_encoder(response))
+            if not is_degraded(response):
+                await result_cache.set(key, content, ttl)
+            return Response(
+                content=content,
+                media_type="application/json",
+                headers={"X-Cache": "MISS"},
+            )
+
+        return wrapper
+
+    return decorator
@@ -3,14 +3,19 @@ Configuration settings for the backend
 """
 
 import os
-
-# Import the env path manager
 import sys
-from typing import List, Optional
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from pydantic_settings import BaseSettings
+# This file is in backend/core/, so the project root is two levels up
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
-sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+# env_path_manager lives at the project root
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
 from env_path_manager import get_path_manager
 
 
@@ -21,6 +26,11 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     DEBUG: bool = False
+    LOG_LEVEL: str = "INFO"  # WARNING in production drops per-request logs
+    # Production: WORKERS=$(nproc); each worker loads its own models, so size
+    # to available GPU memory. LIMIT_CONCURRENCY sheds load with 503s.
+    WORKERS: int = 1
+    LIMIT_CONCURRENCY: Optional[int] = None
 
     # CORS settings
     ALLOWED_ORIGINS: List[str] = [
@@ -29,6 +39,7 @@ class Settings(BaseSettings):
         "http://127.0.0.1:3000",
         "http://127.0.0.1:8080",
     ]
+    CORS_MAX_AGE: int = 86400  # seconds browsers may cache preflight responses
 
     # Model paths - using absolute paths
     SUPPORT_MODELS_DIR: str = ""
@@ -46,6 +57,7 @@ class Settings(BaseSettings):
     FAISS_BEIT3_PATH: str = ""
     ID2IMG_JSON_PATH: str = ""
     MAP_KEYFRAMES_PATH: str = ""
+    VIDEO_INFO_CACHE_PATH: str = ""  # scanned video/keyframe listing
 
     # Data paths - using absolute paths
     DATA_ROOT: str = ""
@@ -63,37 +75,61 @@ class Settings(BaseSettings):
 
     # Cache settings
     REDIS_URL: str = "redis://localhost:6379"
+    CACHE_ENABLED: bool = True
     CACHE_TTL: int = 3600  # 1 hour
+    LONG_CACHE_TTL: int = 86400  # 24 hours, for OCR/ASR results
+    CACHE_KEY_VERSION: str = "v1"  # bump after rebuilding indexes
+    RESULT_CACHE_LOCAL_SIZE: int = 512  # in-process tier in front of Redis
+    METADATA_CACHE_SIZE: int = 4096
+    METADATA_CACHE_TTL: int = 3600  # 1 hour
+    METADATA_CACHE_MAX_AGE: int = 60  # client-side Cache-Control max-age
+    FRAME_METADATA_CACHE_SIZE: int = 100_000  # memoized per-frame lookups
+    FRAMES_STREAM_THRESHOLD: int = 200  # stream frame listings above this limit
+    FRAMES_STREAM_CHUNK: int = 64  # frames per streamed chunk
 
     # Model loading
     LAZY_LOAD_MODELS: bool = True
     MODEL_DEVICE: str = "auto"  # auto, cpu, cuda
+    WARMUP_ON_START: bool = True  # warm encoders/indexes before reporting ready
+    COMPILE_ENCODERS: bool = False  # torch.compile the CLIP text encoder on warmup
+    INFERENCE_WORKERS: int = 0  # 0 = min(2 * num_gpus, num_cpus)
+    MAX_CONCURRENT_GPU: int = 2  # inference calls allowed on the device at once
 
     # Search settings
     DEFAULT_SEARCH_LIMIT: int = 20
     MAX_SEARCH_LIMIT: int = 100
 
+    # Result fusion (services/result_fusion.py)
+    FUSION_METHOD: str = "reciprocal_rank"
+    ENABLE_DUPLICATE_REMOVAL: bool = True
+    MODEL_PRIORITIES: Dict[str, int] = {"clip": 1, "longclip": 2, "clip2video": 3}
+
+    # Request micro-batching
+    ENABLE_REQUEST_BATCHING: bool = True
+    BATCH_MAX_SIZE: int = 16
+    BATCH_MAX_WAIT_MS: float = 50.0
+
+    # Health checks
+    HEALTH_SAMPLE_INTERVAL: float = 5.0  # seconds between system metric samples
+
     # OCR settings
     OCR_MODEL_PATH: str = ""
 
     # ASR settings
     ASR_MODEL_PATH: str = ""
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Resolve data, checkpoint and index paths once after env loading"""
         # Get the path manager instance
         path_manager = get_path_manager()
 
         # Use the env path manager for data paths
         self.DATA_ROOT = path_manager.get_data_root()
 
-        # This file is in backend/core/, so we need to go up 2 levels to get to project root
-        project_root = os.path.abspath(
-            os.path.join(os.path.dirname(__file__), "..", "..")
-        )
-
         # Updated paths for new repository structure
-        self.SUPPORT_MODELS_DIR = os.path.join(project_root, "support_models")
+        self.SUPPORT_MODELS_DIR = str(PROJECT_ROOT / "support_models")
 
         # Checkpoints are now in root checkpoints folder
         self.LONGCLIP_CHECKPOINT = path_manager.get_checkpoints_data_path(
@@ -123,6 +159,9 @@ class Settings(BaseSettings):
         # Mapping files are now in root dict folder
         self.ID2IMG_JSON_PATH = path_manager.get_dict_data_path("id2img.json")
         self.MAP_KEYFRAMES_PATH = path_manager.get_dict_data_path("map_keyframes.json")
+        self.VIDEO_INFO_CACHE_PATH = path_manager.get_dict_data_path(
+            "video_info.cache.json"
+        )
 
         # Data paths using env path manager for flexible data source
         self.VIDEO_DATA_DIR = path_manager.get_video_data_path("Videos_L21/video")
@@ -131,23 +170,21 @@ class Settings(BaseSettings):
         )
 
         # Use the resolved data root for other data paths
-        self.FEATURES_DIR = os.path.join(project_root, "features")
+        features_dir = str(PROJECT_ROOT / "features")
+        self.FEATURES_DIR = features_dir
         self.RAW_DATA_DIR = self.DATA_ROOT  # Use resolved path
-        self.INDEXES_DIR = os.path.join(
-            project_root, "features"
-        )  # Features now contain indexes
-        self.HDF5_FEATURES_DIR = os.path.join(project_root, "features")
-        self.FAISS_INDEXES_DIR = os.path.join(project_root, "features")
-        self.LUCENE_INDEXES_DIR = os.path.join(
-            path_manager.get_data_root(), "lucene"
-        )  # If needed
-        self.SAMPLE_DATA_DIR = os.path.join(project_root, "examples/sample_data")
-        self.OCR_MODEL_PATH = os.path.join(project_root, "support_models/OCR")
-        self.ASR_MODEL_PATH = os.path.join(project_root, "support_models/ASR")
-
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+        self.INDEXES_DIR = features_dir  # Features now contain indexes
+        self.HDF5_FEATURES_DIR = features_dir
+        self.FAISS_INDEXES_DIR = features_dir
+        self.LUCENE_INDEXES_DIR = os.path.join(self.DATA_ROOT, "lucene")  # If needed
+        self.SAMPLE_DATA_DIR = str(PROJECT_ROOT / "examples" / "sample_data")
+        self.OCR_MODEL_PATH = str(PROJECT_ROOT / "support_models" / "OCR")
+        self.ASR_MODEL_PATH = str(PROJECT_ROOT / "support_models" / "ASR")
+
+    @cached_property
+    def ALLOWED_ORIGINS_SET(self) -> frozenset:
+        """Allowed CORS origins as a set for constant-time membership checks"""
+        return frozenset(self.ALLOWED_ORIGINS)
 
 
 # Global settings instance
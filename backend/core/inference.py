@@ -0,0 +1,83 @@
+"""
+Bounded executor for blocking model inference
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import structlog
+from core.config import settings
+
+logger = structlog.get_logger()
+
+
+def _default_workers() -> int:
+    """Two workers per GPU (one when CPU-only), capped by the CPU count"""
+    try:
+        import torch
+
+        num_gpus = torch.cuda.device_count()
+    except Exception:
+        num_gpus = 0
+    return max(1, min(2 * max(num_gpus, 1), os.cpu_count() or 1))
+
+
+class InferencePool:
+    """
+    Runs blocking inference off the event loop.
+
+    Calls go through a ``ThreadPoolExecutor`` so torch/FAISS work no longer
+    stalls other requests, and an ``asyncio.Semaphore`` caps how many of them
+    hit the device at once. Before ``start()`` (e.g. lifespan skipped) calls
+    run inline, as they did before the pool existed.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def executor(self) -> Optional[ThreadPoolExecutor]:
+        return self._executor
+
+    def start(self) -> None:
+        """Create the executor and device semaphore"""
+        if self._executor is not None:
+            return
+        workers = settings.INFERENCE_WORKERS or _default_workers()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="inf"
+        )
+        self._semaphore = asyncio.Semaphore(max(1, settings.MAX_CONCURRENT_GPU))
+        logger.info(
+            "Inference pool started",
+            workers=workers,
+            max_concurrent_gpu=settings.MAX_CONCURRENT_GPU,
+        )
+
+    def shutdown(self) -> None:
+        """Wait for running calls and release the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._semaphore = None
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result"""
+        if self._executor is None:
+            return fn(*args, **kwargs)
+
+        # Carry the caller's contextvars (request ID) into the worker thread
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, call
+            )
+
+
+# Global inference pool instance
+inference_pool = InferencePool()
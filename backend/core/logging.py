@@ -2,38 +2,113 @@
 Logging configuration for the backend
 """
 
+import logging
+import queue
 import sys
-from typing import Any, Dict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
 import structlog
 
+_listener: Optional[QueueListener] = None
+_listener_running = False
+
+
+class _StructlogQueueHandler(QueueHandler):
+    """Queue handler that hands records over untouched.
+
+    The default ``prepare()`` formats the record on the calling thread, which
+    would flatten structlog's event dict before the listener can render it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _add_record_timestamp(_, __, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Stamp stdlib records with their creation time, not queue-drain time"""
+    created = datetime.fromtimestamp(event_dict["_record"].created, tz=timezone.utc)
+    event_dict["timestamp"] = created.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    return event_dict
+
 
 def setup_logging() -> None:
     """Setup structured logging"""
+    global _listener
+
+    from core.config import settings
+
+    # Everything that depends on the caller (contextvars, the event time and
+    # sys.exc_info()) runs on the calling thread; only rendering runs on the
+    # listener thread. Level filtering runs first so dropped events cost no
+    # further processing.
+    pre_chain = [
+        structlog.stdlib.filter_by_level,
+        structlog.contextvars.merge_contextvars,
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+    if settings.DEBUG:
+        pre_chain.append(structlog.processors.StackInfoRenderer())
+    pre_chain.append(structlog.processors.format_exc_info)
 
     # Configure structlog
     structlog.configure(
+        processors=pre_chain + [structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+    formatter = structlog.stdlib.ProcessorFormatter(
         processors=[
-            structlog.stdlib.filter_by_level,
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.UnicodeDecoder(),
+            structlog.processors.JSONRenderer(),
+        ],
+        foreign_pre_chain=[
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
+            structlog.stdlib.ExtraAdder(),
+            _add_record_timestamp,
             structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer(),
         ],
-        context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
-        cache_logger_on_first_use=True,
     )
 
-    # Configure standard library logging
-    import logging
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    # Configure standard library logging: callers only enqueue records
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.handlers = [_StructlogQueueHandler(log_queue)]
+    root_logger.setLevel(settings.LOG_LEVEL.upper())
+
+    shutdown_logging()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    start_logging()
+
+
+def start_logging() -> None:
+    """Start the listener thread that writes queued records"""
+    global _listener_running
+
+    if _listener is not None and not _listener_running:
+        _listener.start()
+        _listener_running = True
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener_running
 
-    logging.basicConfig(format="%(message)s", stream=sys.stdout, level=logging.INFO)
+    if _listener is not None and _listener_running:
+        _listener.stop()
+        _listener_running = False
 
 
 def get_logger(name: str = None) -> structlog.BoundLogger:
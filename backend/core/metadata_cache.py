@@ -0,0 +1,44 @@
+"""
+In-process cache of pre-serialized metadata responses
+"""
+
+import hashlib
+from typing import Any, Callable, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+from core.config import settings
+
+
+class MetadataCache:
+    """TTL/LRU cache mapping a key to (JSON bytes, ETag)"""
+
+    def __init__(self, maxsize: int = 4096, ttl: int = 3600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_or_build(
+        self, key: str, loader: Callable[[], Any]
+    ) -> Optional[Tuple[bytes, str]]:
+        """Return cached bytes and ETag, building them with ``loader`` on a miss.
+
+        A loader returning ``None`` (e.g. unknown video) is not cached.
+        """
+        entry = self._cache.get(key)
+        if entry is None:
+            payload = loader()
+            if payload is None:
+                return None
+            content = orjson.dumps(payload)
+            etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+            entry = self._cache[key] = (content, etag)
+        return entry
+
+    def invalidate(self) -> None:
+        """Drop every cached entry (after metadata reloads)"""
+        self._cache.clear()
+
+
+# Global metadata cache instance
+metadata_cache = MetadataCache(
+    maxsize=settings.METADATA_CACHE_SIZE, ttl=settings.METADATA_CACHE_TTL
+)
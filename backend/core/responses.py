@@ -0,0 +1,72 @@
+"""
+Response helpers for pre-serialized JSON payloads
+"""
+
+import hashlib
+from typing import Any, Tuple
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# Constant payloads (model/language lists) can be cached by clients for a day
+STATIC_CACHE_CONTROL = "public, max-age=86400"
+
+
+def static_json(payload: Any) -> Tuple[bytes, str]:
+    """Serialize a constant payload once, returning its bytes and a weak ETag"""
+    content = orjson.dumps(payload)
+    return content, f'W/"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+# Result schemas stay BaseModel rather than slotted (pydantic) dataclasses:
+# orjson encodes this __dict__ faster than it walks slotted dataclasses, which
+# outweighs their cheaper construction on response-sized lists.
+def _orjson_default(obj: Any) -> Any:
+    """Let orjson walk Pydantic models directly (fields only, no validation)"""
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ModelJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes Pydantic models and numpy values.
+
+    Results can be handed over as model objects: orjson serializes the whole
+    payload in one pass instead of a ``model_dump()`` copy followed by a
+    second encoding walk.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def etag_response(
+    request: Request, content: bytes, etag: str, cache_control: str
+) -> Response:
+    """Serve JSON bytes with an ETag, answering 304 when the client has them"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
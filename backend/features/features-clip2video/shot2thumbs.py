@@ -7,10 +7,14 @@ shot2thumbs.py (v2)
     ví dụ: ...\thumbnails\Videos_L21\L21_V001\001.jpg
 
 - id2shot.json được cập nhật in-place: trường "thumb_path" trỏ đến đường dẫn mới.
+  Trong lúc chạy, thay đổi được ghi nối vào id2shot.patches.jsonl và chỉ gộp vào
+  JSON ở cuối; nếu bị ngắt, lần chạy sau tự áp lại các patch còn sót.
 
 Chạy:
   python shot2thumbs.py                  # xử lý toàn bộ
   python shot2thumbs.py --limit 50       # test 50 entries đầu
+  python shot2thumbs.py --workers 4      # số ffmpeg chạy song song
+  python shot2thumbs.py --hwaccel        # giải mã bằng GPU nếu ffmpeg hỗ trợ
 
 Yêu cầu:
 - ffmpeg trong PATH (đã cài qua conda-forge)
@@ -23,8 +27,16 @@ import os
 import shutil
 import subprocess
 import sys
+import tempfile
 import time
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # fallback: json chuẩn của Python
+    orjson = None
 
 # =======================
 # CẤU HÌNH MẶC ĐỊNH
@@ -36,7 +48,14 @@ OUT_ROOT = r"F:\My Drive\AIC2025_data\thumbnails"  # gốc của thumbnails
 
 THUMB_WIDTH = 480
 JPEG_QUALITY = "3"
+JSON_BUFFER = 1 << 16  # 64KB buffer ghi/đọc id2shot.json
 FFMPEG_LOGLV = "error"  # "quiet"/"error"/"warning"/"info"
+# số ffmpeg chạy song song; giới hạn 8 để tránh nghẽn ổ đĩa
+MAX_WORKERS = min(os.cpu_count() or 1, 8)
+# thứ tự ưu tiên khi tự dò decoder phần cứng (--hwaccel)
+HWACCEL_PREFERRED = ("cuda", "vaapi", "videotoolbox")
+# video có từ ngần này shot trở lên thì trích tất cả trong một lần decode
+BATCH_MIN_SHOTS = 8
 
 
 # =======================
@@ -54,21 +73,66 @@ def backup_json(path: str) -> str:
 
 
 def read_json(path: str) -> dict:
+    if orjson is not None:
+        with open(path, "rb", buffering=JSON_BUFFER) as f:
+            return orjson.loads(f.read())
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
 def write_json(path: str, obj: dict):
     tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        # orjson giữ nguyên ký tự Unicode (như ensure_ascii=False)
+        with open(tmp, "wb", buffering=JSON_BUFFER) as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
     os.replace(tmp, path)
 
 
+def patches_path_for(path: str) -> str:
+    """id2shot.json -> id2shot.patches.jsonl (nhật ký thay đổi thumb_path)"""
+    return f"{os.path.splitext(path)[0]}.patches.jsonl"
+
+
+def _dumps_line(obj: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def append_patch(f, k: str, thumb_path: str):
+    """Ghi một dòng {"k", "thumb_path"}; đủ để khôi phục nếu bị ngắt giữa chừng."""
+    f.write(_dumps_line({"k": k, "thumb_path": thumb_path}))
+    f.flush()
+
+
+def apply_patches(path: str, data: dict) -> int:
+    """Áp các patch còn sót từ lần chạy trước vào data, trả về số patch đã áp."""
+    if not os.path.exists(path):
+        return 0
+    n = 0
+    with open(path, "rb", buffering=JSON_BUFFER) as f:
+        for line in f:
+            try:
+                patch = orjson.loads(line) if orjson is not None else json.loads(line)
+            except ValueError:
+                # dòng cuối có thể bị cắt dở khi tiến trình bị kill
+                continue
+            meta = data.get(patch.get("k"))
+            if meta is not None:
+                meta["thumb_path"] = patch["thumb_path"]
+                n += 1
+    return n
+
+
 def safe_float(v) -> Optional[float]:
+    # float() tự bỏ khoảng trắng hai đầu; không cần str(v).strip() tạo chuỗi mới
     try:
-        return float(str(v).strip())
-    except Exception:
+        return float(v)
+    except (TypeError, ValueError):
         return None
 
 
@@ -79,23 +143,38 @@ def csv_path_for_video(csv_root: str, video_id: str) -> Optional[str]:
     return candidate if os.path.exists(candidate) else None
 
 
+@lru_cache(maxsize=512)
+def _bounds_for_csv(csv_file: str) -> Tuple[Tuple[float, float], ...]:
+    """Đọc CSV một lần, trả về (start, end) của mọi shot hợp lệ theo thứ tự."""
+    rows = []
+    with open(csv_file, "r", encoding="utf-8", newline="") as f:
+        rdr = csv.reader(f)
+        header = next(rdr, None)
+        if header is None:
+            return ()
+        header = [h.strip() for h in header]
+        try:
+            i_start = header.index("Start Time (seconds)")
+            i_end = header.index("End Time (seconds)")
+        except ValueError:
+            return ()
+        for r in rdr:
+            try:
+                rows.append((float(r[i_start]), float(r[i_end])))
+            except (IndexError, ValueError):
+                continue
+    return tuple(rows)
+
+
 def read_psd_row_bounds(
     csv_file: str, shot_index: int
 ) -> Optional[Tuple[float, float]]:
     try:
-        rows = []
-        with open(csv_file, "r", encoding="utf-8", newline="") as f:
-            rdr = csv.DictReader(f)
-            for r in rdr:
-                s = safe_float(r.get("Start Time (seconds)"))
-                e = safe_float(r.get("End Time (seconds)"))
-                if s is None or e is None:
-                    continue
-                rows.append((s, e))
-        if 0 <= shot_index < len(rows):
-            return rows[shot_index]
+        rows = _bounds_for_csv(csv_file)
     except Exception:
-        pass
+        return None
+    if 0 <= shot_index < len(rows):
+        return rows[shot_index]
     return None
 
 
@@ -131,21 +210,70 @@ def video_file_for_id(video_root: str, video_id: str) -> Optional[str]:
     return None
 
 
-def out_path_for_shot(out_root: str, video_id: str, shot_index: int) -> str:
-    """Tạo đường dẫn mới theo chuẩn yêu cầu."""
+def shot_thumb_path(out_root: str, video_id: str, shot_index: int) -> str:
+    """Đường dẫn mới theo chuẩn yêu cầu (không tạo thư mục)."""
     batch = video_id.split("_")[0]  # "L21"
     folder = os.path.join(out_root, f"Videos_{batch}", video_id)
-    ensure_dir(folder)
     # tên file 3-digit theo thứ tự shot (1-based)
     name = f"{shot_index + 1:03d}.jpg"
     return os.path.join(folder, name)
 
 
-def make_thumb(video_path: str, mid_sec: float, out_path: str) -> bool:
+def list_existing_files(root: str) -> Set[str]:
+    """Liệt kê mọi file dưới root bằng một lần duyệt cây (thay cho stat từng file)."""
+    existing: Set[str] = set()
+    for dirpath, _, files in os.walk(root):
+        existing.update(os.path.join(dirpath, fn) for fn in files)
+    return existing
+
+
+def run_ffmpeg(cmd: List[str]) -> bool:
+    """
+    Chạy một lệnh ffmpeg, trả về True nếu thoát với mã 0.
+    stdin/stdout nối vào DEVNULL: nhiều ffmpeg song song không tranh nhau đọc
+    terminal; stderr giữ nguyên để vẫn thấy log lỗi.
+    Không chạy được (thiếu ffmpeg, lệnh quá dài...) cũng trả về False.
+    """
+    try:
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL
+        )
+    except OSError:
+        return False
+    return proc.wait() == 0
+
+
+def detect_hwaccel() -> Optional[str]:
+    """Hỏi ffmpeg -hwaccels một lần, trả về decoder phần cứng ưu tiên (hoặc None)."""
+    try:
+        out = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-hwaccels"],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+        ).stdout
+    except OSError:
+        return None
+    available = set(out.split()[1:])  # bỏ dòng tiêu đề "Hardware acceleration methods:"
+    for name in HWACCEL_PREFERRED:
+        if name in available:
+            return name
+    return None
+
+
+def hwaccel_args(hwaccel: Optional[str]) -> List[str]:
+    # frame giải mã trên GPU được tự chép về RAM nên filter scale vẫn chạy trên CPU
+    return ["-hwaccel", hwaccel] if hwaccel else []
+
+
+def make_thumb(
+    video_path: str, mid_sec: float, out_path: str, hwaccel: Optional[str] = None
+) -> bool:
     """
     Thử 2 chiến lược:
     1) Fast seek: -ss trước -i (nhanh)
     2) Accurate seek (fallback): -ss sau -i + bỏ qua lỗi nhẹ
+    Có hwaccel mà cả hai đều lỗi (codec không hỗ trợ) → chạy lại bằng CPU.
     """
     # 1) Fast seek (nhanh)
     cmd_fast = [
@@ -153,6 +281,9 @@ def make_thumb(video_path: str, mid_sec: float, out_path: str) -> bool:
         "-hide_banner",
         "-loglevel",
         FFMPEG_LOGLV,  # ví dụ: "error" hoặc "warning" để xem thêm log
+        "-threads",
+        "1",  # mỗi ffmpeg một luồng, song song hoá ở mức tiến trình
+        *hwaccel_args(hwaccel),
         "-ss",
         f"{mid_sec}",
         "-i",
@@ -166,11 +297,9 @@ def make_thumb(video_path: str, mid_sec: float, out_path: str) -> bool:
         "-y",
         out_path,
     ]
-    try:
-        subprocess.run(cmd_fast, check=True)
+    if run_ffmpeg(cmd_fast):
         return os.path.exists(out_path)
-    except subprocess.CalledProcessError:
-        pass  # thử fallback
+    # thử fallback
 
     # 2) Accurate seek (chậm hơn nhưng bền)
     #   - đặt -ss sau -i để ffmpeg giải mã tuần tự đến thời điểm mong muốn
@@ -184,6 +313,9 @@ def make_thumb(video_path: str, mid_sec: float, out_path: str) -> bool:
         "ignore_err",  # bỏ qua lỗi giải mã nhẹ
         "-fflags",
         "+discardcorrupt+genpts",  # bỏ frame hỏng, tự sinh PTS nếu cần
+        "-threads",
+        "1",
+        *hwaccel_args(hwaccel),
         "-i",
         video_path,
         "-ss",
@@ -197,11 +329,91 @@ def make_thumb(video_path: str, mid_sec: float, out_path: str) -> bool:
         "-y",
         out_path,
     ]
+    if run_ffmpeg(cmd_accurate) and os.path.exists(out_path):
+        return True
+    if hwaccel:
+        return make_thumb(video_path, mid_sec, out_path)
+    return False
+
+
+def make_thumbs_batch(
+    video_path: str, shots: List[Tuple[float, str]], hwaccel: Optional[str] = None
+) -> bool:
+    """
+    Trích thumbnail cho nhiều shot của cùng một video bằng MỘT lệnh ffmpeg:
+    decode tuần tự một lần, filter select lấy frame đầu tiên có t >= mid_sec
+    của từng shot. Trả về False (và dọn file tạm) nếu số frame ra không khớp.
+    """
+    shots = sorted(shots)
+    folder = os.path.dirname(shots[0][1])
+    # thư mục tạm mới cho mỗi lần chạy: file sót từ lần bị ngắt không lọt vào
+    tmp_dir = tempfile.mkdtemp(prefix=".batch_", dir=folder)
+    pattern = os.path.join(tmp_dir, "%05d.jpg")
+    # chọn frame nếu nó là frame đầu tiên vượt qua một mốc thời gian nào đó
+    terms = [
+        f"gte(t,{t})*(isnan(prev_selected_t)+lt(prev_selected_t,{t}))" for t, _ in shots
+    ]
+    vf = f"select='{'+'.join(terms)}',scale='min({THUMB_WIDTH},iw)':-2"
+    # filter ghi ra file: mỗi shot thêm ~85 ký tự, đưa thẳng vào argv thì vài
+    # trăm shot đã vượt giới hạn dòng lệnh 32767 ký tự của Windows
+    script_path = os.path.join(tmp_dir, "filter.txt")
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        FFMPEG_LOGLV,
+        "-threads",
+        "1",
+        *hwaccel_args(hwaccel),
+        "-i",
+        video_path,
+        "-filter_script:v",
+        script_path,
+        "-vsync",
+        "0",
+        "-frames:v",
+        str(len(shots)),
+        "-q:v",
+        JPEG_QUALITY,
+        "-y",
+        pattern,
+    ]
+    outputs = [pattern % (i + 1) for i in range(len(shots))]
     try:
-        subprocess.run(cmd_accurate, check=True)
-        return os.path.exists(out_path)
-    except subprocess.CalledProcessError:
-        return False
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(vf)
+        # đếm đúng số frame ffmpeg thật sự ghi ra trong thư mục tạm
+        ok = run_ffmpeg(cmd) and sorted(
+            fn for fn in os.listdir(tmp_dir) if fn.endswith(".jpg")
+        ) == [os.path.basename(p) for p in outputs]
+        if ok:
+            for tmp, (_, out_path) in zip(outputs, shots):
+                os.replace(tmp, out_path)
+        return ok
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def make_video_thumbs_worker(
+    job: Tuple[str, List[Tuple[str, float, str]]],
+    hwaccel: Optional[str] = None,
+) -> List[Tuple[str, str, bool]]:
+    """
+    Tạo thumbnail cho mọi shot cần trích của một video (video_path, shots).
+    Video nhiều shot dùng make_thumbs_batch; nếu batch lỗi thì quay về
+    make_thumb từng shot (make_thumb tự lùi về CPU nếu hwaccel lỗi).
+    """
+    video_path, shots = job
+    # mọi shot của một video nằm chung một thư mục
+    ensure_dir(os.path.dirname(shots[0][2]))
+    if len(shots) >= BATCH_MIN_SHOTS and make_thumbs_batch(
+        video_path, [(mid, out_path) for _, mid, out_path in shots], hwaccel
+    ):
+        return [(key, out_path, True) for key, _, out_path in shots]
+    return [
+        (key, out_path, make_thumb(video_path, mid, out_path, hwaccel))
+        for key, mid, out_path in shots
+    ]
 
 
 # =======================
@@ -216,6 +428,15 @@ def main():
     parser.add_argument("--video-root", default=VIDEO_ROOT)
     parser.add_argument("--out-root", default=OUT_ROOT)
     parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    # tắt mặc định: với 1 frame/lần gọi, chi phí khởi tạo GPU có thể lớn hơn phần lợi
+    parser.add_argument(
+        "--hwaccel",
+        nargs="?",
+        const="auto",
+        default=None,
+        help="giải mã bằng phần cứng; không ghi giá trị → tự dò cuda/vaapi/videotoolbox",
+    )
     args = parser.parse_args()
 
     id2shot_path = args.id2shot
@@ -228,27 +449,51 @@ def main():
         sys.exit(1)
 
     data = read_json(id2shot_path)
-    keys = sorted(data.keys(), key=lambda x: int(x))
+
+    # patch còn sót (lần chạy trước bị ngắt) → áp vào data trước khi xử lý
+    patches_path = patches_path_for(id2shot_path)
+    n_patches = apply_patches(patches_path, data)
+    if n_patches:
+        print(f"[+] Applied {n_patches} pending patches from: {patches_path}")
+
+    # gom theo video: các shot của một video được xử lý liền nhau, file video
+    # nằm sẵn trong page cache giữa các lần seek
+    keys = sorted(
+        data.keys(),
+        key=lambda k: (str(data[k]["video_id"]), int(data[k]["shot_index"])),
+    )
     if args.limit is not None:
         keys = keys[: args.limit]
 
-    # backup trước khi sửa
-    bak = backup_json(id2shot_path)
-    print(f"[+] Backed up to: {bak}")
-
     total = made = moved = skipped = missing_video = failed_ffmpeg = no_time = 0
 
+    # thumbnail đã có: một lần duyệt out_root thay vì os.path.exists từng key
+    existing = list_existing_files(out_root)
+
+    # thay đổi thumb_path được ghi nối vào file patch, chỉ gộp vào JSON ở cuối
+    patch_f = open(patches_path, "ab")
+
+    def set_thumb(k: str, new_path: str):
+        nonlocal n_patches
+        meta = data[k]
+        if meta.get("thumb_path") != new_path:
+            meta["thumb_path"] = new_path
+            append_patch(patch_f, k, new_path)
+            n_patches += 1
+
+    # 1) Lập kế hoạch: xử lý skip/move ngay, gom các shot cần ffmpeg theo video
+    jobs: Dict[str, List[Tuple[str, float, str]]] = {}
     for k in keys:
         meta = data[k]
         video_id = str(meta["video_id"])
         shot_idx = int(meta["shot_index"])
 
         # đích mới theo cấu trúc yêu cầu
-        new_path = out_path_for_shot(out_root, video_id, shot_idx)
+        new_path = shot_thumb_path(out_root, video_id, shot_idx)
 
         # nếu đã đúng vị trí mới → cập nhật và bỏ qua
-        if os.path.exists(new_path):
-            meta["thumb_path"] = new_path
+        if new_path in existing:
+            set_thumb(k, new_path)
             skipped += 1
             total += 1
             continue
@@ -263,7 +508,7 @@ def main():
             ensure_dir(os.path.dirname(new_path))
             try:
                 shutil.move(old_path, new_path)
-                meta["thumb_path"] = new_path
+                set_thumb(k, new_path)
                 moved += 1
                 total += 1
                 continue
@@ -284,16 +529,41 @@ def main():
             total += 1
             continue
 
-        ok = make_thumb(vpath, mid, new_path)
-        if ok:
-            meta["thumb_path"] = new_path
-            made += 1
-        else:
-            failed_ffmpeg += 1
+        jobs.setdefault(vpath, []).append((k, mid, new_path))
+
+    hwaccel = args.hwaccel
+    if hwaccel == "auto":
+        hwaccel = detect_hwaccel()
+        print(f"[+] Hardware decoder: {hwaccel or 'none found, using CPU'}")
+
+    # 2) Chạy ffmpeg song song theo video; các video độc lập nhau
+    n_shots = sum(len(shots) for shots in jobs.values())
+    print(
+        f"[+] Extracting {n_shots} thumbnails from {len(jobs)} videos "
+        f"with {args.workers} workers"
+    )
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = [
+            executor.submit(make_video_thumbs_worker, job, hwaccel)
+            for job in jobs.items()
+        ]
+        for fut in as_completed(futures):
+            for k, new_path, ok in fut.result():
+                if ok:
+                    set_thumb(k, new_path)
+                    made += 1
+                else:
+                    failed_ffmpeg += 1
+                total += 1
 
-        total += 1
+    patch_f.close()
 
-    write_json(id2shot_path, data)
+    # 3) Gộp patch vào id2shot.json; không có thay đổi thì không ghi lại file lớn
+    if n_patches:
+        bak = backup_json(id2shot_path)
+        print(f"[+] Backed up to: {bak}")
+        write_json(id2shot_path, data)
+    os.remove(patches_path)
 
     print("\n=== SUMMARY ===")
     print("Total entries     :", total)
@@ -303,7 +573,8 @@ def main():
     print("Missing video     :", missing_video)
     print("No mid time       :", no_time)
     print("ffmpeg failed     :", failed_ffmpeg)
-    print("Updated JSON      :", id2shot_path)
+    print("Patched entries   :", n_patches)
+    print("Updated JSON      :", id2shot_path if n_patches else "(unchanged)")
     print("Output root       :", out_root)
 
 
@@ -2,12 +2,18 @@
 LongCLIP wrapper for feature extraction
 """
 
+import io
 import os
 import sys
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 import numpy as np
 
+try:
+    from PIL import Image
+except ImportError:  # only needed for image encoding
+    Image = None
+
 # Add Long-CLIP to path
 longclip_path = os.path.join(
     os.path.dirname(__file__), "..", "..", "..", "support_models", "Long-CLIP"
@@ -18,7 +24,15 @@ if longclip_path not in sys.path:
 try:
     # Try to import the actual LongCLIP model
     import torch
+    from model import longclip as _longclip
     from model.longclip import load
+    from torchvision import transforms
+
+    _tokenize = _longclip.tokenize
+
+    # CLIP image normalization stats
+    CLIP_MEAN = (0.48145466, 0.4578275, 0.40821073)
+    CLIP_STD = (0.26862954, 0.26130258, 0.27577711)
 
     class LongCLIPModel:
         """LongCLIP model wrapper"""
@@ -27,6 +41,17 @@ try:
             self.device = device
             self.model = None
             self.preprocess = None
+            self._tokenize = _tokenize
+            self._fallback_preprocess = transforms.Compose(
+                [
+                    transforms.Resize(
+                        224, interpolation=transforms.InterpolationMode.BICUBIC
+                    ),
+                    transforms.CenterCrop(224),
+                    transforms.ToTensor(),
+                    transforms.Normalize(CLIP_MEAN, CLIP_STD),
+                ]
+            )
             self._load_model(checkpoint_path)
 
         def _load_model(self, checkpoint_path: str):
@@ -47,85 +72,80 @@ try:
                 )
                 self.model = None
 
-        def encode_image(
-            self, image_source: Union[str, bytes, np.ndarray]
+        def _load_image(self, image_source: Union[str, bytes, np.ndarray]):
+            """Convert an image source to a PIL RGB image"""
+            if Image is None:
+                raise ImportError("Pillow is required for image encoding")
+            if isinstance(image_source, str):
+                # Load image from path
+                return Image.open(image_source).convert("RGB")
+            elif isinstance(image_source, bytes):
+                # Load image from bytes
+                return Image.open(io.BytesIO(image_source)).convert("RGB")
+            elif isinstance(image_source, np.ndarray):
+                # Convert numpy array to PIL Image
+                return Image.fromarray(image_source).convert("RGB")
+            raise ValueError(f"Unsupported image source type: {type(image_source)}")
+
+        def encode_images(
+            self, image_sources: List[Union[str, bytes, np.ndarray]]
         ) -> np.ndarray:
-            """Encode image to features"""
-            if self.model is None:
-                return self._generate_mock_features()
+            """
+            Encode a batch of images to a ``(n, d)`` feature matrix.
 
-            try:
-                # Convert image source to PIL Image
-                if isinstance(image_source, str):
-                    # Load image from path
-                    from PIL import Image
-
-                    image = Image.open(image_source).convert("RGB")
-                elif isinstance(image_source, bytes):
-                    # Load image from bytes
-                    import io
-
-                    from PIL import Image
+            On CUDA the stacked batch is pinned, copied without blocking and
+            encoded under fp16 autocast; one forward pass serves all images.
+            """
+            if self.model is None or not image_sources:
+                return self._generate_mock_batch(len(image_sources))
 
-                    image = Image.open(io.BytesIO(image_source)).convert("RGB")
-                elif isinstance(image_source, np.ndarray):
-                    # Convert numpy array to PIL Image
-                    from PIL import Image
-
-                    image = Image.fromarray(image_source).convert("RGB")
-                else:
-                    raise ValueError(
-                        f"Unsupported image source type: {type(image_source)}"
-                    )
+            try:
+                preprocess = self.preprocess or self._preprocess_image
+                batch = torch.stack(
+                    [preprocess(self._load_image(src)) for src in image_sources]
+                )
 
-                # Preprocess and encode with model
-                if self.preprocess:
-                    image_tensor = self.preprocess(image).unsqueeze(0).to(self.device)
+                on_cuda = str(self.device).startswith("cuda")
+                if on_cuda:
+                    batch = batch.pin_memory().to(self.device, non_blocking=True)
                 else:
-                    # Fallback preprocessing
-                    image_tensor = (
-                        self._preprocess_image(image).unsqueeze(0).to(self.device)
-                    )
+                    batch = batch.to(self.device)
 
-                with torch.no_grad():
-                    features = self.model.encode_image(image_tensor)
-                    features = features.cpu().numpy()
-                    return features.flatten()
+                autocast = torch.autocast(
+                    device_type="cuda", dtype=torch.float16, enabled=on_cuda
+                )
+                with torch.inference_mode(), autocast:
+                    features = self.model.encode_image(batch)
+                return features.float().cpu().numpy().reshape(len(image_sources), -1)
 
             except Exception as e:
                 print(f"Image encoding failed: {e}")
-                return self._generate_mock_features()
+                return self._generate_mock_batch(len(image_sources))
+
+        def encode_image(
+            self, image_source: Union[str, bytes, np.ndarray]
+        ) -> np.ndarray:
+            """Encode image to features"""
+            return self.encode_images([image_source])[0]
 
         def encode_text(self, text: str) -> np.ndarray:
-            """Encode text to features"""
+            """Encode text to features, under fp16 autocast on CUDA"""
             if self.model is None:
                 return self._generate_mock_features()
 
             try:
                 # LongCLIP expects tokenized text, not raw text
-                # Import the tokenizer from the longclip module
-                import sys
-
-                longclip_path = os.path.join(
-                    os.path.dirname(__file__),
-                    "..",
-                    "..",
-                    "..",
-                    "support_models",
-                    "Long-CLIP",
-                )
-                if longclip_path not in sys.path:
-                    sys.path.append(longclip_path)
-
-                from model import longclip
-
-                # Tokenize the text first
-                tokens = longclip.tokenize([text]).to(self.device)
+                tokens = self._tokenize([text]).to(self.device)
 
                 # Encode with model
-                with torch.no_grad():
+                autocast = torch.autocast(
+                    device_type="cuda",
+                    dtype=torch.float16,
+                    enabled=str(self.device).startswith("cuda"),
+                )
+                with torch.inference_mode(), autocast:
                     features = self.model.encode_text(tokens)
-                    features = features.cpu().numpy()
+                    features = features.float().cpu().numpy()
                     # Ensure features have the right shape for FAISS (batch dimension)
                     if features.ndim == 1:
                         features = features.reshape(1, -1)
@@ -143,26 +163,16 @@ try:
 
         def _preprocess_image(self, image):
             """Fallback preprocessing for image"""
-            # Basic preprocessing - resize to 224x224
-            image = image.resize((224, 224))
-
-            # Convert to tensor and normalize
-            image_tensor = torch.from_numpy(np.array(image)).float()
-            image_tensor = image_tensor.permute(2, 0, 1) / 255.0
-
-            # Normalize with ImageNet stats
-            mean = torch.tensor([0.48145466, 0.4578275, 0.40821073])
-            std = torch.tensor([0.26862954, 0.26130258, 0.27577711])
-            image_tensor = (
-                image_tensor - mean.unsqueeze(1).unsqueeze(2)
-            ) / std.unsqueeze(1).unsqueeze(2)
-
-            return image_tensor
+            return self._fallback_preprocess(image)
 
         def _generate_mock_features(self) -> np.ndarray:
             """Generate mock features for testing"""
             return np.random.randn(512).astype(np.float32)
 
+        def _generate_mock_batch(self, n: int) -> np.ndarray:
+            """Generate mock features for a batch of ``n`` inputs"""
+            return np.random.randn(n, 512).astype(np.float32)
+
 except ImportError:
     # Fallback to mock model
     class LongCLIPModel:
@@ -178,6 +188,12 @@ except ImportError:
             """Generate mock image features"""
             return np.random.randn(512).astype(np.float32)
 
+        def encode_images(
+            self, image_sources: List[Union[str, bytes, np.ndarray]]
+        ) -> np.ndarray:
+            """Generate mock image features for a batch"""
+            return np.random.randn(len(image_sources), 512).astype(np.float32)
+
         def encode_text(self, text: str) -> np.ndarray:
             """Generate mock text features"""
             return np.random.randn(512).astype(np.float32)
@@ -2,17 +2,163 @@
 FAISS index management for video retrieval
 """
 
-import json
 import os
 import pickle
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Union
 
 import faiss
 import numpy as np
+import orjson
 import structlog
 
 logger = structlog.get_logger()
 
+# FAISS needs roughly this many training points per coarse centroid; more only
+# makes k-means slower without improving the clustering
+TRAIN_POINTS_PER_CENTROID = 256
+# Min/max ranges for 8-bit scalar quantization settle well within this many rows
+SQ_TRAIN_POINTS = 1 << 16
+# Rows normalized and added per step when building from HDF5
+STREAM_CHUNK_ROWS = 1 << 16
+
+
+def _training_sample(
+    features: np.ndarray, sample_size: int, seed: int = 0
+) -> np.ndarray:
+    """Pick a random subset of ``sample_size`` rows of ``features`` for training"""
+    num_vectors = features.shape[0]
+    sample_size = min(num_vectors, sample_size)
+    if sample_size == num_vectors:
+        return features
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(num_vectors, sample_size, replace=False))
+    return np.ascontiguousarray(features[rows])
+
+
+def _normalized(x: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize rows in place, copying once only if ``x`` is not already a
+    contiguous float32 matrix. ``faiss.normalize_L2`` stays faster than a
+    NumPy norm/divide even for a single query, so it is used for every size.
+    """
+    if x.ndim == 1:
+        x = x.reshape(1, -1)
+    x = np.ascontiguousarray(x, dtype=np.float32)
+    faiss.normalize_L2(x)
+    return x
+
+
+@dataclass
+class MetadataColumns:
+    """
+    Per-vector metadata stored column-wise as NumPy arrays.
+
+    Row ``i`` of every column belongs to FAISS id ``i``, so a search result is
+    an array gather instead of ``str(id)`` dict lookups. String fields become
+    fixed-width unicode arrays and integer fields ``int64``, so the table
+    saves as a flat record array that loads memory-mapped.
+    """
+
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    size: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @staticmethod
+    def _column(values: list) -> np.ndarray:
+        try:
+            column = np.asarray(values)
+        except ValueError:  # ragged nested values
+            column = None
+        if column is None or column.dtype.kind not in "biufU" or column.ndim != 1:
+            # Mixed or nested values fall back to one object per row
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+        return column
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "MetadataColumns":
+        keys = list(dict.fromkeys(k for record in records for k in record))
+        columns = {k: cls._column([r.get(k) for r in records]) for k in keys}
+        return cls(columns=columns, size=len(records))
+
+    def extend(self, records: List[Dict]) -> None:
+        """Append rows for ids ``size .. size + len(records) - 1``"""
+        if not records:
+            return
+        if self.size == 0:
+            new = MetadataColumns.from_records(records)
+            self.columns, self.size = new.columns, new.size
+            return
+        new = MetadataColumns.from_records(records)
+        for key in set(self.columns) | set(new.columns):
+            old_col = self.columns.get(key)
+            new_col = new.columns.get(key)
+            if old_col is None:
+                old_col = self._column([None] * self.size)
+            if new_col is None:
+                new_col = self._column([None] * new.size)
+            self.columns[key] = np.concatenate([old_col, new_col])
+        self.size += new.size
+
+    def gather(self, ids: np.ndarray) -> List[Dict]:
+        """Metadata dicts for ``ids``, in order"""
+        ids = np.asarray(ids, dtype=np.int64)
+        valid = (ids >= 0) & (ids < self.size)
+        safe_ids = np.where(valid, ids, 0)
+        gathered = {k: col[safe_ids].tolist() for k, col in self.columns.items()}
+        return [
+            (
+                {k: values[i] for k, values in gathered.items()}
+                if ok
+                else {"error": f"Metadata not found for index {idx}"}
+            )
+            for i, (idx, ok) in enumerate(zip(ids.tolist(), valid.tolist()))
+        ]
+
+    def save(self, path: str) -> None:
+        """
+        Save as one structured ``.npy`` record array that ``load`` can
+        memory-map. Columns holding Python objects cannot be mapped and are
+        written as an ``.npz`` instead.
+        """
+        # Write through a file object so NumPy keeps the given file name
+        with open(path, "wb") as f:
+            if any(col.dtype == object for col in self.columns.values()):
+                np.savez(f, **self.columns)
+                return
+            records = np.empty(
+                self.size, dtype=[(k, col.dtype) for k, col in self.columns.items()]
+            )
+            for k, col in self.columns.items():
+                records[k] = col
+            np.save(f, records)
+
+    @classmethod
+    def load(cls, path: str) -> "MetadataColumns":
+        """Load a ``.npy``/``.npz`` save, or a legacy ``{"<id>": {...}}`` JSON"""
+        with open(path, "rb") as f:
+            magic = f.read(6)
+
+        if magic == b"\x93NUMPY":
+            # Pages are read on demand; a search only touches the rows it returns
+            records = np.load(path, mmap_mode="r")
+            names = records.dtype.names or ()
+            return cls(columns={k: records[k] for k in names}, size=len(records))
+
+        if magic[:2] == b"PK":
+            with np.load(path, allow_pickle=True) as data:
+                columns = {k: data[k] for k in data.files}
+            size = len(next(iter(columns.values()))) if columns else 0
+            return cls(columns=columns, size=size)
+
+        with open(path, "rb") as f:
+            legacy = orjson.loads(f.read())
+        size = max(map(int, legacy), default=-1) + 1
+        return cls.from_records([legacy.get(str(i), {}) for i in range(size)])
+
 
 class FAISSIndex:
     """FAISS index management for video features"""
@@ -21,9 +167,11 @@ class FAISSIndex:
         self.index_path = index_path
         self.metadata_path = metadata_path
         self.index = None
-        self.metadata = {}
+        self.metadata = MetadataColumns()
         self.feature_dim = None
         self.is_trained = False
+        self.on_gpu = False
+        self._gpu_resources = None
 
     def build_index(
         self,
@@ -47,50 +195,172 @@ class FAISSIndex:
         # Normalize features for cosine similarity
         faiss.normalize_L2(features)
 
+        index, train_size = self._new_index(index_type, num_vectors, **kwargs)
+        if train_size:
+            index.train(_training_sample(features, train_size, kwargs.get("seed", 0)))
+
+        # Add vectors under explicit int64 ids so removals keep ids stable
+        self.index = faiss.IndexIDMap2(index)
+        self.index.add_with_ids(features, np.arange(num_vectors, dtype=np.int64))
+        self._finish_build(index_type, use_gpu, MetadataColumns.from_records(metadata))
+
+    def build_index_chunked(
+        self,
+        features,
+        metadata: MetadataColumns,
+        index_type: str = "flat",
+        use_gpu: bool = False,
+        chunk_size: int = STREAM_CHUNK_ROWS,
+        **kwargs,
+    ) -> None:
+        """
+        Build from a row-sliceable matrix such as an ``h5py.Dataset`` without
+        loading it whole: train on an evenly strided sample, then normalize
+        and add ``chunk_size`` rows at a time.
+        """
+        num_vectors, self.feature_dim = features.shape
+        if num_vectors == 0:
+            raise ValueError("Features array is empty")
+
+        logger.info(
+            f"Building {index_type} FAISS index with {num_vectors} vectors of dimension {self.feature_dim} in chunks of {chunk_size}"
+        )
+
+        index, train_size = self._new_index(index_type, num_vectors, **kwargs)
+        if train_size:
+            step = max(1, num_vectors // train_size)
+            index.train(_normalized(features[::step][:train_size]))
+
+        self.index = faiss.IndexIDMap2(index)
+        for start in range(0, num_vectors, chunk_size):
+            chunk = _normalized(features[start : start + chunk_size])
+            ids = np.arange(start, start + len(chunk), dtype=np.int64)
+            self.index.add_with_ids(chunk, ids)
+        self._finish_build(index_type, use_gpu, metadata)
+
+    def _new_index(
+        self, index_type: str, num_vectors: int, **kwargs
+    ) -> Tuple[faiss.Index, int]:
+        """Untrained index for ``index_type`` and how many points it trains on (0 = none)"""
         if index_type == "flat":
-            self.index = faiss.IndexFlatIP(self.feature_dim)
+            return faiss.IndexFlatIP(self.feature_dim), 0
         elif index_type == "ivf":
             nlist = kwargs.get("nlist", min(4096, num_vectors // 30))
-            self.index = faiss.IndexIVFFlat(
+            index = faiss.IndexIVFFlat(
                 faiss.IndexFlatIP(self.feature_dim), self.feature_dim, nlist
             )
-            self.index.train(features)
+            return index, TRAIN_POINTS_PER_CENTROID * nlist
         elif index_type == "ivfpq":
             nlist = kwargs.get("nlist", min(4096, num_vectors // 30))
             m = kwargs.get("m", 8)  # number of subquantizers
             bits = kwargs.get("bits", 8)  # bits per subquantizer
-            self.index = faiss.IndexIVFPQ(
+            ivfpq = faiss.IndexIVFPQ(
                 faiss.IndexFlatIP(self.feature_dim), self.feature_dim, nlist, m, bits
             )
-            self.index.train(features)
+            if kwargs.get("opq", True) and self.feature_dim % m == 0:
+                # Rotate dimensions so each subquantizer sees balanced variance
+                opq = faiss.OPQMatrix(self.feature_dim, m)
+                ivfpq = faiss.IndexPreTransform(opq, ivfpq)
+            return ivfpq, TRAIN_POINTS_PER_CENTROID * nlist
+        elif index_type == "hnsw":
+            # Graph search: no training, sublinear query time on large corpora
+            index = faiss.IndexHNSWFlat(
+                self.feature_dim, kwargs.get("M", 32), faiss.METRIC_INNER_PRODUCT
+            )
+            index.hnsw.efConstruction = kwargs.get("efConstruction", 200)
+            # Stored with the index, so loaded copies keep the same default
+            index.hnsw.efSearch = kwargs.get("efSearch", 64)
+            return index, 0
+        elif index_type in ("sq8", "fp16"):
+            # Exhaustive search over scalar-quantized codes: 1/4 (sq8) or 1/2
+            # (fp16) of the flat index's memory, close to exact recall
+            qtype = (
+                faiss.ScalarQuantizer.QT_8bit
+                if index_type == "sq8"
+                else faiss.ScalarQuantizer.QT_fp16
+            )
+            index = faiss.IndexScalarQuantizer(
+                self.feature_dim, qtype, faiss.METRIC_INNER_PRODUCT
+            )
+            # sq8 learns per-dimension ranges; fp16 needs no training
+            return index, SQ_TRAIN_POINTS if index_type == "sq8" else 0
         else:
             raise ValueError(f"Unsupported index type: {index_type}")
 
-        # Add vectors to index
-        self.index.add(features)
+    def _finish_build(
+        self, index_type: str, use_gpu: bool, metadata: MetadataColumns
+    ) -> None:
         self.is_trained = True
 
+        if use_gpu:
+            self._move_to_gpu(use_float16=index_type == "ivfpq")
+
         # Store metadata
-        self.metadata = {str(i): meta for i, meta in enumerate(metadata)}
+        self.metadata = metadata
 
         logger.info(
             f"FAISS index built successfully. Index type: {type(self.index).__name__}"
         )
 
+    def _base_index(self) -> faiss.Index:
+        """The index behind an ``IndexIDMap`` wrapper, downcast to its type"""
+        if isinstance(self.index, faiss.IndexIDMap):
+            return faiss.downcast_index(self.index.index)
+        return self.index
+
+    def _move_to_gpu(self, use_float16: bool = False) -> None:
+        """Clone the index onto GPU 0 if FAISS was built with GPU support"""
+        # FAISS has no GPU counterpart for HNSW graphs or IndexScalarQuantizer
+        base = self._base_index()
+        if isinstance(base, (faiss.IndexHNSW, faiss.IndexScalarQuantizer)):
+            logger.warning(
+                f"{type(base).__name__} has no FAISS GPU version; keeping it on CPU"
+            )
+            return
+        if faiss.get_num_gpus() == 0:
+            logger.warning("use_gpu requested but no FAISS GPU is available")
+            return
+
+        self._gpu_resources = faiss.StandardGpuResources()
+        co = faiss.GpuClonerOptions()
+        co.useFloat16 = use_float16  # halves PQ lookup-table VRAM
+        self.index = faiss.index_cpu_to_gpu(self._gpu_resources, 0, self.index, co)
+        self.on_gpu = True
+        logger.info("Moved FAISS index to GPU 0")
+
+    def set_ef_search(self, ef_search: int) -> None:
+        """Set the HNSW ``efSearch`` depth (recall vs. latency) for later searches"""
+        faiss.ParameterSpace().set_index_parameter(self.index, "efSearch", ef_search)
+
     def search(
         self, query_features: np.ndarray, k: int = 10, return_metadata: bool = True
     ) -> Tuple[np.ndarray, np.ndarray, List[Dict]]:
         """Search for similar vectors"""
+        if query_features.ndim == 1:
+            query_features = query_features.reshape(1, -1)
+
+        scores, indices, metadata_results = self.search_batch(
+            query_features[:1], k, return_metadata
+        )
+        return scores[0], indices[0], metadata_results[0] if return_metadata else []
+
+    def search_batch(
+        self, query_features: np.ndarray, k: int = 10, return_metadata: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray, List[List[Dict]]]:
+        """
+        Search a ``(n, d)`` batch of queries with one FAISS call.
+
+        Queries are L2-normalized in place (after at most one copy to a
+        contiguous float32 buffer). Returns 2-D scores/indices and, per query,
+        the metadata of its hits.
+        """
         if self.index is None:
             raise RuntimeError("FAISS index not built or loaded")
 
         if not self.is_trained:
             raise RuntimeError("FAISS index not trained")
 
-        # Normalize query features
-        if query_features.ndim == 1:
-            query_features = query_features.reshape(1, -1)
-        faiss.normalize_L2(query_features)
+        query_features = _normalized(query_features)
 
         # Perform search
         scores, indices = self.index.search(query_features, min(k, self.index.ntotal))
@@ -98,15 +368,9 @@ class FAISSIndex:
         # Get metadata for returned indices
         metadata_results = []
         if return_metadata:
-            for idx in indices[0]:
-                if str(idx) in self.metadata:
-                    metadata_results.append(self.metadata[str(idx)])
-                else:
-                    metadata_results.append(
-                        {"error": f"Metadata not found for index {idx}"}
-                    )
+            metadata_results = [self.metadata.gather(row) for row in indices]
 
-        return scores[0], indices[0], metadata_results
+        return scores, indices, metadata_results
 
     def save_index(self, index_path: str = None, metadata_path: str = None) -> None:
         """Save FAISS index and metadata to disk"""
@@ -119,16 +383,18 @@ class FAISSIndex:
         if not index_path or not metadata_path:
             raise ValueError("Both index_path and metadata_path must be provided")
 
-        # Save FAISS index
-        faiss.write_index(self.index, index_path)
+        # Save FAISS index; GPU indexes are written in the portable CPU format
+        cpu_index = faiss.index_gpu_to_cpu(self.index) if self.on_gpu else self.index
+        faiss.write_index(cpu_index, index_path)
         logger.info(f"Saved FAISS index to {index_path}")
 
         # Save metadata
-        with open(metadata_path, "w") as f:
-            json.dump(self.metadata, f, indent=2)
+        self.metadata.save(metadata_path)
         logger.info(f"Saved metadata to {metadata_path}")
 
-    def load_index(self, index_path: str = None, metadata_path: str = None) -> None:
+    def load_index(
+        self, index_path: str = None, metadata_path: str = None, use_gpu: bool = False
+    ) -> None:
         """Load FAISS index and metadata from disk"""
         index_path = index_path or self.index_path
         metadata_path = metadata_path or self.metadata_path
@@ -146,10 +412,13 @@ class FAISSIndex:
         self.index = faiss.read_index(index_path)
         self.feature_dim = self.index.d
         self.is_trained = True
+        self.on_gpu = False
+        if use_gpu:
+            ivf = faiss.try_extract_index_ivf(self.index)
+            self._move_to_gpu(use_float16=isinstance(ivf, faiss.IndexIVFPQ))
 
         # Load metadata
-        with open(metadata_path, "r") as f:
-            self.metadata = json.load(f)
+        self.metadata = MetadataColumns.load(metadata_path)
 
         logger.info(
             f"Loaded FAISS index from {index_path} with {self.index.ntotal} vectors"
@@ -171,9 +440,11 @@ class FAISSIndex:
             "metadata_entries": len(self.metadata),
         }
 
-        # Add index-specific stats
-        if hasattr(self.index, "nlist"):
-            stats["nlist"] = self.index.nlist
+        # Add index-specific stats (IVF may sit behind an OPQ pre-transform)
+        try:
+            stats["nlist"] = faiss.extract_index_ivf(self.index).nlist
+        except RuntimeError:
+            pass
 
         return stats
 
@@ -188,15 +459,21 @@ class FAISSIndex:
             )
 
         # Normalize new features
-        faiss.normalize_L2(new_features)
+        new_features = _normalized(new_features)
 
-        # Add to index
-        start_id = self.index.ntotal
-        self.index.add(new_features)
+        # Add to index; ids continue after the last metadata row
+        if isinstance(self.index, faiss.IndexIDMap):
+            start_id = len(self.metadata)
+            new_ids = np.arange(start_id, start_id + len(new_features), dtype=np.int64)
+            self.index.add_with_ids(new_features, new_ids)
+        else:
+            # Indexes saved before ids were explicit use positional ids
+            start_id = self.index.ntotal
+            self.index.add(new_features)
 
         # Add metadata
-        for i, meta in enumerate(new_metadata):
-            self.metadata[str(start_id + i)] = meta
+        padding = start_id - len(self.metadata)
+        self.metadata.extend([{}] * padding + list(new_metadata))
 
         logger.info(f"Added {len(new_features)} new vectors to index")
 
@@ -205,17 +482,18 @@ class FAISSIndex:
         if self.index is None:
             raise RuntimeError("Index not loaded")
 
-        if not hasattr(self.index, "remove_ids"):
+        # IndexIDMap2 always has remove_ids; whether it works depends on the
+        # index it wraps, and HNSW graphs raise on removal
+        if not hasattr(self.index, "remove_ids") or isinstance(
+            self._base_index(), faiss.IndexHNSW
+        ):
             logger.warning("This index type doesn't support vector removal")
             return
 
-        # Remove from index
-        faiss_vector_ids = faiss.IDSelectorArray(vector_ids)
-        self.index.remove_ids(faiss_vector_ids)
-
-        # Remove from metadata
-        for vid in vector_ids:
-            self.metadata.pop(str(vid), None)
+        # Remove from index; metadata rows stay but are no longer returned.
+        # IDSelectorBatch hashes the ids, so each stored id is checked in O(1)
+        ids = np.ascontiguousarray(vector_ids, dtype=np.int64)
+        self.index.remove_ids(faiss.IDSelectorBatch(ids))
 
         logger.info(f"Removed {len(vector_ids)} vectors from index")
 
@@ -247,35 +525,29 @@ def build_faiss_index_from_hdf5(
 
         # Use first feature type for now (can be extended to multi-modal)
         first_model = list(features_group.keys())[0]
-        features = features_group[first_model][:]
-
-        # Prepare metadata
-        metadata = []
-        for i in range(len(features)):
-            metadata.append(
-                {
-                    "video_id": (
-                        meta_group["video_ids"][i].decode()
-                        if isinstance(meta_group["video_ids"][i], bytes)
-                        else meta_group["video_ids"][i]
-                    ),
-                    "frame_id": (
-                        meta_group["frame_ids"][i].decode()
-                        if isinstance(meta_group["frame_ids"][i], bytes)
-                        else meta_group["frame_ids"][i]
-                    ),
-                    "shot_id": int(meta_group["shot_ids"][i]),
-                    "global_index": i,
-                }
-            )
+        features = features_group[first_model]
+        num_vectors = features.shape[0]
 
-    # Build index
-    faiss_index = FAISSIndex()
-    faiss_index.build_index(features, metadata, index_type, use_gpu, **kwargs)
+        # Metadata is read column-wise; strings decode once per dataset
+        metadata = MetadataColumns(
+            columns={
+                "video_id": meta_group["video_ids"].asstr()[:].astype(str),
+                "frame_id": meta_group["frame_ids"].asstr()[:].astype(str),
+                "shot_id": meta_group["shot_ids"][:].astype(np.int64),
+                "global_index": np.arange(num_vectors, dtype=np.int64),
+            },
+            size=num_vectors,
+        )
+
+        # Build index while the file is open; features are read in chunks
+        faiss_index = FAISSIndex()
+        faiss_index.build_index_chunked(
+            features, metadata, index_type, use_gpu, **kwargs
+        )
 
     # Save index
     index_path = os.path.join(output_dir, f"faiss_{first_model}.bin")
-    metadata_path = os.path.join(output_dir, f"metadata_{first_model}.json")
+    metadata_path = os.path.join(output_dir, f"metadata_{first_model}.npy")
     faiss_index.save_index(index_path, metadata_path)
 
     return faiss_index
@@ -2,6 +2,15 @@
 Main FastAPI application for MM-Data Intelligent Agent
 """
 
+try:
+    # libuv-based event loop; not available on Windows
+    import uvloop
+except ImportError:
+    uvloop = None
+else:
+    uvloop.install()
+
+import asyncio
 import os
 import sys
 from contextlib import asynccontextmanager
@@ -14,9 +23,13 @@ if backend_dir not in sys.path:
 import structlog
 import uvicorn
 from api import asr, health, ocr, search, temporal
+from core.cache import result_cache
 from core.config import settings
-from core.logging import setup_logging
-from fastapi import FastAPI, HTTPException
+from core.inference import inference_pool
+from core.logging import setup_logging, shutdown_logging, start_logging
+from core.request_context import RequestContextMiddleware
+from core.responses import ModelJSONResponse
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -30,12 +43,42 @@ logger = structlog.get_logger()
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
     # Startup
+    start_logging()
     logger.info("Starting MM-Data Intelligent Agent Backend")
 
+    # Blocking inference runs on a bounded thread pool
+    inference_pool.start()
+    app.state.inference_pool = inference_pool
+
     # Initialize services (lazy loading)
     from services.model_manager import ModelManager
 
-    app.state.model_manager = ModelManager()
+    model_manager = ModelManager()
+    app.state.model_manager = model_manager
+
+    # Service objects are cheap to create (models still load on first use),
+    # so resolve them once here instead of in every request dependency
+    await model_manager.ensure_models_loaded()
+    app.state.search_service = model_manager.search_service
+    app.state.ocr_service = model_manager.ocr_service
+    app.state.asr_service = model_manager.asr_service
+    app.state.temporal_service = model_manager.temporal_service
+
+    # Routers read their services from module globals instead of Depends
+    for router_module in (search, temporal, ocr, asr):
+        router_module.bind(model_manager)
+
+    await model_manager.start_dispatchers()
+
+    # Warm models in the background; /health/ready reports 503 until done
+    if settings.WARMUP_ON_START:
+        app.state.warmup_task = asyncio.create_task(model_manager.warmup())
+
+    # Sample system metrics off the request path for /health/detailed
+    metrics_task = asyncio.create_task(health.sample_system_metrics(app))
+
+    await result_cache.connect()
+    app.state.result_cache = result_cache
 
     logger.info("Backend services initialized")
 
@@ -43,8 +86,17 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down MM-Data Intelligent Agent Backend")
+    metrics_task.cancel()
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None:
+        warmup_task.cancel()
     if hasattr(app.state, "model_manager"):
         await app.state.model_manager.cleanup()
+    await result_cache.close()
+    inference_pool.shutdown()
+
+    # Flush queued log records
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -53,18 +105,21 @@ app = FastAPI(
     description="Multi-modal search and analysis backend for video/image data",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ModelJSONResponse,
 )
 
 # Add middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
+    allow_origins=settings.ALLOWED_ORIGINS_SET,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=settings.CORS_MAX_AGE,
 )
 
 app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(RequestContextMiddleware)
 
 # Mount static files for serving images
 try:
@@ -106,7 +161,9 @@ async def root():
 async def global_exception_handler(request, exc):
     """Global exception handler"""
     logger.error("Unhandled exception", exc_info=exc)
-    return HTTPException(status_code=500, detail="Internal server error")
+    return ModelJSONResponse(
+        status_code=500, content={"detail": "Internal server error"}
+    )
 
 
 if __name__ == "__main__":
@@ -116,4 +173,8 @@ if __name__ == "__main__":
         port=settings.PORT,
         reload=settings.DEBUG,
         log_level="info",
+        loop="uvloop" if uvloop is not None else "asyncio",
+        http="httptools",
+        workers=settings.WORKERS,
+        limit_concurrency=settings.LIMIT_CONCURRENCY,
     )
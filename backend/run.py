@@ -3,6 +3,8 @@
 Simple startup script for the backend
 """
 
+import importlib.util
+
 import uvicorn
 from core.config import settings
 
@@ -13,4 +15,8 @@ if __name__ == "__main__":
         port=settings.PORT,
         reload=settings.DEBUG,
         log_level="info",
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools",
+        workers=settings.WORKERS,
+        limit_concurrency=settings.LIMIT_CONCURRENCY,
     )
@@ -2,9 +2,9 @@
 ASR-related schemas
 """
 
-from typing import List, Optional, Union
+from typing import List, Optional, TypedDict, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .common import BaseResponse
 
@@ -12,6 +12,8 @@ from .common import BaseResponse
 class ASRRequest(BaseModel):
     """ASR speech-to-text request"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     audio_source: Union[str, bytes] = Field(
         ..., description="Audio source (URL, base64, or file)"
     )
@@ -32,15 +34,6 @@ class ASRTranscript(BaseModel):
     speaker_id: Optional[str] = None
 
 
-class ASRResponse(BaseModel):
-    """ASR response"""
-
-    success: bool = True
-    message: str = "ASR completed successfully"
-    data: dict = Field(..., description="ASR results")
-    metadata: dict = Field(default_factory=dict, description="ASR metadata")
-
-
 class ASRData(BaseModel):
     """ASR result data"""
 
@@ -57,3 +50,48 @@ class ASRMetadata(BaseModel):
     audio_duration: Optional[float] = None
     asr_engine: str = "whisper"
     model_version: Optional[str] = None
+
+
+class ASRResponse(BaseModel):
+    """ASR response"""
+
+    model_config = ConfigDict(frozen=True)
+
+    success: bool = True
+    message: str = "ASR completed successfully"
+    data: ASRData = Field(..., description="ASR results")
+    metadata: ASRMetadata = Field(..., description="ASR metadata")
+
+
+# Response skeletons for server-built payloads (no Pydantic validation)
+
+
+class ASRMetadataDict(TypedDict):
+    processing_time_ms: float
+    audio_duration: Optional[float]
+    asr_engine: str
+    model_version: Optional[str]
+
+
+class ASRResponseDict(TypedDict):
+    success: bool
+    message: str
+    data: ASRData
+    metadata: ASRMetadataDict
+
+
+def build_asr_response(
+    result: ASRData, processing_time_ms: float, asr_engine: str = "whisper"
+) -> ASRResponseDict:
+    """Build an ASR response payload from a service result"""
+    return {
+        "success": True,
+        "message": "ASR completed successfully",
+        "data": result,
+        "metadata": {
+            "processing_time_ms": processing_time_ms,
+            "audio_duration": None,
+            "asr_engine": asr_engine,
+            "model_version": None,
+        },
+    }
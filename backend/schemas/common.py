@@ -57,6 +57,12 @@ class SearchResult(BaseModel):
     file_path: Optional[str] = None  # Folder and filename (e.g., "L21_V001/001.jpg")
 
 
+class FallbackResults(list):
+    """Mock search results returned when a search fails; never cached"""
+
+    degraded = True
+
+
 class PaginationParams(BaseModel):
     """Pagination parameters"""
 
@@ -2,9 +2,9 @@
 OCR-related schemas
 """
 
-from typing import List, Optional, Union
+from typing import List, Optional, TypedDict, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .common import BaseResponse
 
@@ -12,6 +12,8 @@ from .common import BaseResponse
 class OCRRequest(BaseModel):
     """OCR text extraction request"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     image_source: Union[str, bytes] = Field(
         ..., description="Image source (URL, base64, or file)"
     )
@@ -30,15 +32,6 @@ class OCRTextBlock(BaseModel):
     language: Optional[str] = None
 
 
-class OCRResponse(BaseModel):
-    """OCR response"""
-
-    success: bool = True
-    message: str = "OCR completed successfully"
-    data: dict = Field(..., description="OCR results")
-    metadata: dict = Field(default_factory=dict, description="OCR metadata")
-
-
 class OCRData(BaseModel):
     """OCR result data"""
 
@@ -53,3 +46,46 @@ class OCRMetadata(BaseModel):
     processing_time_ms: float
     image_size: Optional[List[int]] = None
     ocr_engine: str = "default"
+
+
+class OCRResponse(BaseModel):
+    """OCR response"""
+
+    model_config = ConfigDict(frozen=True)
+
+    success: bool = True
+    message: str = "OCR completed successfully"
+    data: OCRData = Field(..., description="OCR results")
+    metadata: OCRMetadata = Field(..., description="OCR metadata")
+
+
+# Response skeletons for server-built payloads (no Pydantic validation)
+
+
+class OCRMetadataDict(TypedDict):
+    processing_time_ms: float
+    image_size: Optional[List[int]]
+    ocr_engine: str
+
+
+class OCRResponseDict(TypedDict):
+    success: bool
+    message: str
+    data: OCRData
+    metadata: OCRMetadataDict
+
+
+def build_ocr_response(
+    result: OCRData, processing_time_ms: float, ocr_engine: str = "default"
+) -> OCRResponseDict:
+    """Build an OCR response payload from a service result"""
+    return {
+        "success": True,
+        "message": "OCR completed successfully",
+        "data": result,
+        "metadata": {
+            "processing_time_ms": processing_time_ms,
+            "image_size": None,
+            "ocr_engine": ocr_engine,
+        },
+    }
@@ -2,16 +2,33 @@
 Search-related schemas
 """
 
-from typing import List, Optional
+from typing import List, Optional, TypedDict
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .common import ModelType, SearchLogic, SearchResult
 
 
+class SearchMetadata(BaseModel):
+    """Search metadata"""
+
+    total_results: int
+    query_time_ms: float
+    model_used: str
+    search_type: str
+
+
+class SearchData(BaseModel):
+    """Search result data"""
+
+    results: List[SearchResult]
+
+
 class TextSearchRequest(BaseModel):
     """Text search request"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     query: str = Field(..., description="Search query text")
     model_type: ModelType = ModelType.CLIP
     limit: int = Field(default=20, ge=1, le=100)
@@ -22,15 +39,14 @@ class TextSearchResponse(BaseModel):
 
     success: bool = True
     message: str = "Search completed successfully"
-    data: dict = Field(
-        default_factory=dict,
-        description="Search results and metadata",
-    )
+    data: SearchData = Field(..., description="Search results")
 
 
 class ImageSearchRequest(BaseModel):
     """Image search request"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     image_source: str = Field(..., description="Image source (URL, path, or base64)")
     model_type: ModelType = ModelType.CLIP
     limit: int = Field(default=20, ge=1, le=100)
@@ -41,15 +57,14 @@ class ImageSearchResponse(BaseModel):
 
     success: bool = True
     message: str = "Search completed successfully"
-    data: dict = Field(
-        default_factory=dict,
-        description="Search results and metadata",
-    )
+    data: SearchData = Field(..., description="Search results")
 
 
 class VisualSearchRequest(BaseModel):
     """Visual search request"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     object_list: List[dict] = Field(..., description="List of detected objects")
     logic: SearchLogic = SearchLogic.AND
     model_type: ModelType = ModelType.CLIP
@@ -61,15 +76,14 @@ class VisualSearchResponse(BaseModel):
 
     success: bool = True
     message: str = "Search completed successfully"
-    data: dict = Field(
-        default_factory=dict,
-        description="Search results and metadata",
-    )
+    data: SearchData = Field(..., description="Search results")
 
 
 class NeighborSearchRequest(BaseModel):
     """Neighbor search request"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     image_id: str = Field(..., description="Image ID to find neighbors for")
     model_type: ModelType = ModelType.CLIP
     limit: int = Field(default=20, ge=1, le=100)
@@ -80,23 +94,52 @@ class NeighborSearchResponse(BaseModel):
 
     success: bool = True
     message: str = "Search completed successfully"
-    data: dict = Field(
-        default_factory=dict,
-        description="Search results and metadata",
-    )
+    data: SearchData = Field(..., description="Search results")
 
 
-class SearchMetadata(BaseModel):
-    """Search metadata"""
+class SearchResponse(BaseModel):
+    """Search response"""
+
+    model_config = ConfigDict(frozen=True)
+
+    data: SearchData = Field(..., description="Search results")
+    metadata: SearchMetadata = Field(..., description="Search metadata")
+
 
+# Response skeletons for server-built payloads. These are plain dicts handed
+# straight to orjson (core.responses.ModelJSONResponse encodes the nested
+# result models), so trusted results skip Pydantic validation and copies.
+
+
+class SearchMetadataDict(TypedDict):
     total_results: int
     query_time_ms: float
     model_used: str
     search_type: str
 
 
-class SearchResponse(BaseModel):
-    """Search response"""
+class SearchDataDict(TypedDict):
+    results: List[SearchResult]
+
+
+class SearchResponseDict(TypedDict):
+    data: SearchDataDict
+    metadata: SearchMetadataDict
+
 
-    data: dict = Field(..., description="Search results")
-    metadata: dict = Field(default_factory=dict, description="Search metadata")
+def build_search_response(
+    results: List[SearchResult],
+    query_time_ms: float,
+    model_used: str,
+    search_type: str,
+) -> SearchResponseDict:
+    """Build a search response payload from service results"""
+    return {
+        "data": {"results": results},
+        "metadata": {
+            "total_results": len(results),
+            "query_time_ms": query_time_ms,
+            "model_used": model_used,
+            "search_type": search_type,
+        },
+    }
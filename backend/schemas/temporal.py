@@ -2,9 +2,9 @@
 Temporal search schemas
 """
 
-from typing import List, Optional
+from typing import ClassVar, List, Optional, TypedDict
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .common import ModelType, SearchResult
 
@@ -12,6 +12,8 @@ from .common import ModelType, SearchResult
 class TemporalSearchRequest(BaseModel):
     """Temporal search request"""
 
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     query: str = Field(..., description="Search query text")
     model_type: ModelType = ModelType.CLIP
     limit: int = Field(default=20, ge=1, le=100)
@@ -21,24 +23,13 @@ class TemporalSearchRequest(BaseModel):
     w_max: Optional[int] = Field(default=None, ge=1)
 
 
-class TemporalSearchResponse(BaseModel):
-    """Temporal search response"""
-
-    success: bool = True
-    message: str = "Temporal search completed successfully"
-    data: dict = Field(
-        default_factory=dict,
-        description="Temporal search results and metadata",
-    )
-
-
 class TemporalResult(BaseModel):
     """Temporal search result"""
 
     video_id: str
     frames: List[int]
-    images: List[str]
-    paths: List[str]
+    images: List[str] = Field(default_factory=list)
+    paths: List[str] = Field(default_factory=list)
     score: float
 
 
@@ -51,6 +42,12 @@ class TemporalData(BaseModel):
     results: List[TemporalResult]
 
 
+class FallbackTemporalData(TemporalData):
+    """Mock temporal data returned when a search fails; never cached"""
+
+    degraded: ClassVar[bool] = True
+
+
 class TemporalMetadata(BaseModel):
     """Temporal search metadata"""
 
@@ -58,3 +55,48 @@ class TemporalMetadata(BaseModel):
     model_used: str
     num_sentences: int
     num_candidate_videos: int
+
+
+class TemporalSearchResponse(BaseModel):
+    """Temporal search response"""
+
+    model_config = ConfigDict(frozen=True)
+
+    success: bool = True
+    message: str = "Temporal search completed successfully"
+    data: TemporalData = Field(..., description="Temporal search results")
+    metadata: TemporalMetadata = Field(..., description="Temporal search metadata")
+
+
+# Response skeletons for server-built payloads (no Pydantic validation)
+
+
+class TemporalMetadataDict(TypedDict):
+    query_time_ms: float
+    model_used: str
+    num_sentences: int
+    num_candidate_videos: int
+
+
+class TemporalResponseDict(TypedDict):
+    success: bool
+    message: str
+    data: TemporalData
+    metadata: TemporalMetadataDict
+
+
+def build_temporal_response(
+    result: TemporalData, query_time_ms: float, model_used: str
+) -> TemporalResponseDict:
+    """Build a temporal search response payload from a service result"""
+    return {
+        "success": True,
+        "message": "Temporal search completed successfully",
+        "data": result,
+        "metadata": {
+            "query_time_ms": query_time_ms,
+            "model_used": model_used,
+            "num_sentences": len(result.sentences),
+            "num_candidate_videos": len(result.candidate_videos),
+        },
+    }
@@ -5,6 +5,7 @@ ASR service for speech-to-text conversion
 from typing import Union
 
 import structlog
+from core.inference import inference_pool
 from schemas.asr import ASRData, ASRTranscript
 
 logger = structlog.get_logger()
@@ -25,7 +26,19 @@ class ASRService:
         timestamp: bool = True,
     ) -> ASRData:
         """Transcribe audio to text using ASR"""
-        logger.info(
+        return await inference_pool.run(
+            self.transcribe_sync, audio_source, language, model_type, timestamp
+        )
+
+    def transcribe_sync(
+        self,
+        audio_source: Union[str, bytes],
+        language: str = "vi",
+        model_type: str = "whisper",
+        timestamp: bool = True,
+    ) -> ASRData:
+        """Blocking ASR core, run on the inference pool"""
+        logger.debug(
             "ASR transcription",
             language=language,
             model=model_type,
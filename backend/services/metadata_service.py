@@ -2,25 +2,188 @@
 Metadata service for handling video-frame relationships and detailed information
 """
 
-import json
+import asyncio
+import functools
+import itertools
 import os
+import sys
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
+import orjson
 import structlog
 from core.config import settings
+from core.metadata_cache import metadata_cache
 
 logger = structlog.get_logger()
 
+# Keyframe folders scanned for per-video keyframe listings
+KEYFRAME_FOLDER_PREFIXES = ("L21_",)
+
+
+def _video_id_of(img_info) -> Optional[str]:
+    """Video of an id2img entry: its ``video_id`` field, or a keyframe path's folder"""
+    if isinstance(img_info, dict):
+        return img_info.get("video_id")
+    if isinstance(img_info, str):
+        # Interned, so every frame of a video shares one ID string
+        return sys.intern(os.path.basename(os.path.dirname(img_info))) or None
+    return None
+
+
+class Id2ImgArray(Mapping):
+    """
+    Read-only ``{"<id>": path}`` view over a converted ``id2img.npy``.
+
+    Row ``i`` holds the keyframe path and video of frame ``"i"``. The record
+    array is memory-mapped, so startup parses nothing and a lookup only pages
+    in the row it reads.
+    """
+
+    def __init__(self, records: np.ndarray):
+        self._records = records
+
+    def __getitem__(self, frame_id: str) -> str:
+        try:
+            row = int(frame_id)
+        except (TypeError, ValueError):
+            raise KeyError(frame_id) from None
+        if not 0 <= row < len(self._records) or str(row) != frame_id:
+            raise KeyError(frame_id)
+        return str(self._records["path"][row])
+
+    def __iter__(self) -> Iterator[str]:
+        return map(str, range(len(self._records)))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def frames_by_video(self) -> Dict[str, List[str]]:
+        """Group frame IDs by video with NumPy instead of a per-row loop"""
+        names, inverse = np.unique(self._records["video_id"], return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(names)))[:-1]
+        return {
+            str(name): [str(row) for row in rows.tolist()]
+            for name, rows in zip(names, np.split(order, bounds))
+        }
+
+
+def convert_id2img(json_path: str, npy_path: Optional[str] = None) -> str:
+    """Write an ``{"<id>": path}`` id2img JSON as a memory-mappable ``.npy``"""
+    npy_path = npy_path or os.path.splitext(json_path)[0] + ".npy"
+    mapping = orjson.loads(Path(json_path).read_bytes())
+    try:
+        paths = [mapping[str(row)] for row in range(len(mapping))]
+    except KeyError as e:
+        raise ValueError(f"id2img ids must run 0..{len(mapping) - 1}: {e}") from None
+    if not all(isinstance(path, str) for path in paths):
+        raise ValueError("id2img values must be keyframe paths")
+
+    path_col = np.array(paths, dtype=str)
+    video_col = np.array([_video_id_of(path) or "" for path in paths], dtype=str)
+    records = np.empty(
+        len(paths), dtype=[("path", path_col.dtype), ("video_id", video_col.dtype)]
+    )
+    records["path"] = path_col
+    records["video_id"] = video_col
+    # Write through a file object so NumPy keeps the given file name
+    with open(npy_path, "wb") as f:
+        np.save(f, records)
+    return npy_path
+
+
+def _load_id2img(path: str) -> Mapping:
+    """Prefer a converted ``id2img.npy`` that is at least as new as the JSON"""
+    binary = os.path.splitext(path)[0] + ".npy"
+    if path and os.path.exists(binary):
+        json_mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+        if os.path.getmtime(binary) >= json_mtime:
+            mapping = Id2ImgArray(np.load(binary, mmap_mode="r"))
+            logger.info(f"Memory-mapped ID to image mapping: {len(mapping)} entries")
+            return mapping
+    mapping = _load_mapping(path, "ID to image mapping")
+    # Entries repeat a few thousand video IDs; share one string per video
+    for img_info in mapping.values():
+        if isinstance(img_info, dict) and isinstance(img_info.get("video_id"), str):
+            img_info["video_id"] = sys.intern(img_info["video_id"])
+    return mapping
+
+
+def _load_mapping(path: str, name: str) -> Dict:
+    """Parse a JSON mapping file with orjson, or return {} if it is missing"""
+    if not os.path.exists(path):
+        logger.warning(f"{name} not found at: {path}")
+        return {}
+    # orjson parses the raw bytes; no text decode pass or stream buffering
+    mapping = orjson.loads(Path(path).read_bytes())
+    logger.info(f"Loaded {name}: {len(mapping)} entries")
+    return mapping
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _video_info_cache_key() -> Dict:
+    """
+    Directory mtimes the cached video listing was built from. They change when
+    videos or per-video keyframe folders are added or removed; delete the cache
+    after changing files inside an existing keyframe folder.
+    """
+    return {
+        "video_dir": settings.VIDEO_DATA_DIR,
+        "video_mtime": _mtime_ns(settings.VIDEO_DATA_DIR),
+        "keyframe_dir": settings.KEYFRAME_DATA_DIR,
+        "keyframe_mtime": _mtime_ns(settings.KEYFRAME_DATA_DIR),
+    }
+
+
+def _read_video_info_cache(key: Dict) -> Optional[Dict[str, Dict]]:
+    """Cached video info if it was built from the same directory state"""
+    if not settings.VIDEO_INFO_CACHE_PATH:
+        return None
+    try:
+        cached = orjson.loads(Path(settings.VIDEO_INFO_CACHE_PATH).read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None
+    return cached.get("video_info")
+
+
+def _write_video_info_cache(key: Dict, video_info: Dict[str, Dict]) -> None:
+    if not settings.VIDEO_INFO_CACHE_PATH:
+        return
+    tmp = settings.VIDEO_INFO_CACHE_PATH + ".tmp"
+    try:
+        Path(tmp).write_bytes(orjson.dumps({"key": key, "video_info": video_info}))
+        os.replace(tmp, settings.VIDEO_INFO_CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"Could not write video info cache: {e}")
+
 
 class MetadataService:
     """Service for managing video-frame metadata and relationships"""
 
     def __init__(self):
-        self._id2img_mapping = None
-        self._keyframe_mapping = None
-        self._video_info = None
+        # Accessors do not re-check initialization; callers gate on
+        # is_initialized(), and until then every lookup finds nothing
+        self._id2img_mapping: Mapping = {}
+        self._keyframe_mapping: Dict = {}
+        self._video_info: Dict[str, Dict] = {}
+        self._video_to_frames: Dict[str, List[str]] = {}
+        self._video_timestamps: Dict[str, np.ndarray] = {}
         self._initialized = False
+        # Mappings are read-only once loaded, so per-frame results can be reused
+        self._frame_metadata = functools.lru_cache(
+            maxsize=settings.FRAME_METADATA_CACHE_SIZE
+        )(self._build_frame_metadata)
 
     async def initialize(self):
         """Initialize the metadata service by loading mapping files"""
@@ -28,36 +191,27 @@ class MetadataService:
             return
 
         try:
-            # Load ID to image mapping
-            if os.path.exists(settings.ID2IMG_JSON_PATH):
-                with open(settings.ID2IMG_JSON_PATH, "r", encoding="utf-8") as f:
-                    self._id2img_mapping = json.load(f)
-                logger.info(
-                    f"Loaded ID to image mapping: {len(self._id2img_mapping)} entries"
-                )
-            else:
-                logger.warning(
-                    f"ID to image mapping not found at: {settings.ID2IMG_JSON_PATH}"
-                )
-                self._id2img_mapping = {}
-
-            # Load keyframe mapping
-            if os.path.exists(settings.MAP_KEYFRAMES_PATH):
-                with open(settings.MAP_KEYFRAMES_PATH, "r", encoding="utf-8") as f:
-                    self._keyframe_mapping = json.load(f)
-                logger.info(
-                    f"Loaded keyframe mapping: {len(self._keyframe_mapping)} entries"
-                )
-            else:
-                logger.warning(
-                    f"Keyframe mapping not found at: {settings.MAP_KEYFRAMES_PATH}"
-                )
-                self._keyframe_mapping = {}
-
-            # Initialize video information
-            self._video_info = self._build_video_info()
+            # Parse both mappings and scan the video directories off the event
+            # loop; one file's read overlaps the other's parse
+            (
+                self._id2img_mapping,
+                self._keyframe_mapping,
+                self._video_info,
+            ) = await asyncio.gather(
+                asyncio.to_thread(_load_id2img, settings.ID2IMG_JSON_PATH),
+                asyncio.to_thread(
+                    _load_mapping, settings.MAP_KEYFRAMES_PATH, "keyframe mapping"
+                ),
+                asyncio.to_thread(self._build_video_info),
+            )
+            self._video_to_frames = await asyncio.to_thread(
+                self._build_video_frames_index
+            )
+            self._frame_metadata.cache_clear()
+            self._video_timestamps.clear()
 
             self._initialized = True
+            metadata_cache.invalidate()
             logger.info("Metadata service initialized successfully")
 
         except Exception as e:
@@ -71,32 +225,45 @@ class MetadataService:
         try:
             # Scan video directory for available videos
             if os.path.exists(settings.VIDEO_DATA_DIR):
-                for video_file in os.listdir(settings.VIDEO_DATA_DIR):
-                    if video_file.endswith(".mp4"):
-                        video_id = video_file.replace(".mp4", "")
-                        video_info[video_id] = {
-                            "filename": video_file,
-                            "path": os.path.join(settings.VIDEO_DATA_DIR, video_file),
-                            "keyframes": [],
-                        }
+                cache_key = _video_info_cache_key()
+                cached = _read_video_info_cache(cache_key)
+                if cached is not None:
+                    logger.info(
+                        f"Loaded video info for {len(cached)} videos from cache"
+                    )
+                    return cached
+
+                # scandir entries carry their type, so no extra stat per file
+                with os.scandir(settings.VIDEO_DATA_DIR) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".mp4") and entry.is_file():
+                            video_id = entry.name.replace(".mp4", "")
+                            video_info[video_id] = {
+                                "filename": entry.name,
+                                "path": entry.path,
+                                "keyframes": [],
+                            }
 
                 # Scan keyframe directory for corresponding keyframes
                 if os.path.exists(settings.KEYFRAME_DATA_DIR):
-                    for video_folder in os.listdir(settings.KEYFRAME_DATA_DIR):
-                        if video_folder.startswith("L21_"):
-                            video_id = video_folder
-                            if video_id in video_info:
-                                keyframe_path = os.path.join(
-                                    settings.KEYFRAME_DATA_DIR,
-                                    video_folder,
-                                    "keyframes",
-                                )
-                                if os.path.exists(keyframe_path):
+                    with os.scandir(settings.KEYFRAME_DATA_DIR) as entries:
+                        for entry in entries:
+                            video_id = entry.name
+                            if (
+                                video_id.startswith(KEYFRAME_FOLDER_PREFIXES)
+                                and video_id in video_info
+                                and entry.is_dir()
+                            ):
+                                keyframe_path = os.path.join(entry.path, "keyframes")
+                                try:
                                     video_info[video_id]["keyframes"] = os.listdir(
                                         keyframe_path
                                     )
+                                except (FileNotFoundError, NotADirectoryError):
+                                    pass
 
                 logger.info(f"Built video info for {len(video_info)} videos")
+                _write_video_info_cache(cache_key, video_info)
             else:
                 logger.warning(
                     f"Video data directory not found: {settings.VIDEO_DATA_DIR}"
@@ -107,20 +274,24 @@ class MetadataService:
 
         return video_info
 
+    def _build_video_frames_index(self) -> Dict[str, List[str]]:
+        """Group frame IDs by video in one pass, keeping mapping order"""
+        if isinstance(self._id2img_mapping, Id2ImgArray):
+            return self._id2img_mapping.frames_by_video()
+        video_to_frames: Dict[str, List[str]] = {}
+        for frame_id, img_info in self._id2img_mapping.items():
+            video_to_frames.setdefault(_video_id_of(img_info), []).append(frame_id)
+        return video_to_frames
+
     def get_video_info(self, video_id: str) -> Optional[Dict]:
         """Get information about a specific video"""
-        if not self._initialized:
-            logger.warning("Metadata service not initialized")
-            return None
-
         return self._video_info.get(video_id)
 
     def get_frame_metadata(self, frame_id: str) -> Optional[Dict]:
-        """Get detailed metadata for a specific frame"""
-        if not self._initialized:
-            logger.warning("Metadata service not initialized")
-            return None
+        """Get detailed metadata for a specific frame (shared, treat as read-only)"""
+        return self._frame_metadata(frame_id)
 
+    def _build_frame_metadata(self, frame_id: str) -> Dict:
         # Get basic image mapping
         img_info = self._id2img_mapping.get(frame_id, {})
 
@@ -136,8 +307,9 @@ class MetadataService:
         }
 
         # Try to find video information
-        if "video_id" in img_info:
-            metadata["video_info"] = self.get_video_info(img_info["video_id"])
+        video_id = _video_id_of(img_info)
+        if video_id:
+            metadata["video_info"] = self.get_video_info(video_id)
         elif "video_id" in keyframe_info:
             metadata["video_info"] = self.get_video_info(keyframe_info["video_id"])
 
@@ -145,62 +317,46 @@ class MetadataService:
 
     def get_video_frames(self, video_id: str) -> List[str]:
         """Get all frame IDs for a specific video"""
-        if not self._initialized:
-            logger.warning("Metadata service not initialized")
-            return []
-
-        frames = []
-        for frame_id, img_info in self._id2img_mapping.items():
-            if img_info.get("video_id") == video_id:
-                frames.append(frame_id)
-
-        return frames
+        return list(self._video_to_frames.get(video_id, ()))
 
     def search_frames_by_video(self, video_id: str, limit: int = 100) -> List[Dict]:
         """Search for frames belonging to a specific video"""
-        if not self._initialized:
-            logger.warning("Metadata service not initialized")
-            return []
-
-        frames = []
-        for frame_id, img_info in self._id2img_mapping.items():
-            if img_info.get("video_id") == video_id:
-                frame_metadata = self.get_frame_metadata(frame_id)
-                if frame_metadata:
-                    frames.append(frame_metadata)
-
-                if len(frames) >= limit:
-                    break
-
-        return frames
+        return list(self.iter_frames_by_video(video_id, limit))
+
+    def iter_frames_by_video(self, video_id: str, limit: int = 100) -> Iterator[Dict]:
+        """Yield frame metadata for a video without building the full list"""
+        frame_ids = self._video_to_frames.get(video_id, ())
+        for frame_id in itertools.islice(frame_ids, max(limit, 0)):
+            yield self.get_frame_metadata(frame_id)
+
+    def _sorted_timestamps(self, video_id: str) -> np.ndarray:
+        """Sorted keyframe timestamps of a video, computed once per video"""
+        timestamps = self._video_timestamps.get(video_id)
+        if timestamps is None:
+            frame_ids = self._video_to_frames.get(video_id, ())
+            keyframes = (self._keyframe_mapping.get(fid, {}) for fid in frame_ids)
+            timestamps = np.fromiter(
+                (kf["timestamp"] for kf in keyframes if kf.get("timestamp")),
+                dtype=np.float64,
+            )
+            timestamps.sort()
+            self._video_timestamps[video_id] = timestamps
+        return timestamps
 
     def get_video_summary(self, video_id: str) -> Optional[Dict]:
         """Get a summary of video information including frame count and timestamps"""
-        if not self._initialized:
-            logger.warning("Metadata service not initialized")
-            return None
-
         video_info = self.get_video_info(video_id)
         if not video_info:
             return None
 
-        frames = self.get_video_frames(video_id)
-
-        # Calculate frame statistics
-        frame_timestamps = []
-        for frame_id in frames:
-            metadata = self.get_frame_metadata(frame_id)
-            if metadata and "keyframe_info" in metadata:
-                timestamp = metadata["keyframe_info"].get("timestamp")
-                if timestamp:
-                    frame_timestamps.append(timestamp)
+        timestamps = self._sorted_timestamps(video_id)
 
         summary = {
             "video_id": video_id,
             "filename": video_info.get("filename"),
-            "total_frames": len(frames),
-            "frame_timestamps": sorted(frame_timestamps) if frame_timestamps else [],
-            "duration_estimate": max(frame_timestamps) if frame_timestamps else 0,
+            "total_frames": len(self._video_to_frames.get(video_id, ())),
+            "frame_timestamps": timestamps.tolist(),
+            "duration_estimate": float(timestamps[-1]) if len(timestamps) else 0,
             "keyframe_count": len(video_info.get("keyframes", [])),
         }
 
@@ -208,10 +364,6 @@ class MetadataService:
 
     def get_all_videos(self) -> List[str]:
         """Get list of all available video IDs"""
-        if not self._initialized:
-            logger.warning("Metadata service not initialized")
-            return []
-
         return list(self._video_info.keys())
 
     def is_initialized(self) -> bool:
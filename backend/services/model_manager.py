@@ -3,10 +3,11 @@ Model manager service for lazy loading and managing ML models
 """
 
 import asyncio
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import structlog
 import torch
+from core.batching import BatchedDispatcher, group_indices
 from core.config import settings
 from services.asr_service import ASRService
 from services.ocr_service import OCRService
@@ -29,8 +30,33 @@ class ModelManager:
         self.asr_service: Optional[ASRService] = None
         self.temporal_service: Optional[TemporalService] = None
 
+        # Micro-batching dispatcher (started from the app lifespan); only text
+        # search has a batched FAISS path behind it
+        self.text_search_dispatcher = self._make_dispatcher(
+            self._text_search_batch, "text_search"
+        )
+
         logger.info("ModelManager initialized")
 
+    def _make_dispatcher(self, batch_fn, name: str) -> BatchedDispatcher:
+        return BatchedDispatcher(
+            batch_fn,
+            max_batch_size=settings.BATCH_MAX_SIZE,
+            max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+            name=name,
+        )
+
+    def _dispatchers(self) -> List[BatchedDispatcher]:
+        return [self.text_search_dispatcher]
+
+    async def start_dispatchers(self):
+        """Start the micro-batching workers"""
+        if not settings.ENABLE_REQUEST_BATCHING:
+            logger.info("Request batching disabled")
+            return
+        for dispatcher in self._dispatchers():
+            await dispatcher.start()
+
     async def ensure_models_loaded(self):
         """Ensure all models are loaded (lazy loading)"""
         if self._models_loaded:
@@ -43,11 +69,19 @@ class ModelManager:
             logger.info("Loading ML models...")
 
             try:
-                # Initialize services (this will trigger model loading)
-                self.search_service = SearchService()
-                self.ocr_service = OCRService()
-                self.asr_service = ASRService()
-                self.temporal_service = TemporalService()
+                # Construct services concurrently off the event loop, so
+                # cold start costs the slowest constructor, not their sum
+                (
+                    self.search_service,
+                    self.ocr_service,
+                    self.asr_service,
+                    self.temporal_service,
+                ) = await asyncio.gather(
+                    asyncio.to_thread(SearchService),
+                    asyncio.to_thread(OCRService),
+                    asyncio.to_thread(ASRService),
+                    asyncio.to_thread(TemporalService),
+                )
 
                 # Services will be loaded lazily when first accessed
                 logger.info("Services created, will be loaded on first access")
@@ -59,6 +93,17 @@ class ModelManager:
                 logger.error("Failed to load ML models", error=str(e))
                 raise
 
+    async def warmup(self):
+        """Load models and warm encoders/indexes ahead of the first request"""
+        await self.ensure_models_loaded()
+        logger.info("Warming up search models...")
+        try:
+            await self.search_service.warmup()
+        except Exception as e:
+            logger.error("Model warmup failed", error=str(e))
+            return
+        logger.info("Model warmup completed")
+
     async def get_search_service(self) -> SearchService:
         """Get search service, loading models if needed"""
         await self.ensure_models_loaded()
@@ -79,6 +124,31 @@ class ModelManager:
         await self.ensure_models_loaded()
         return self.temporal_service
 
+    async def _text_search_batch(self, requests: List[Any]) -> List[Any]:
+        """Run queued text search requests, one service call per (model, limit)"""
+        search_service = await self.get_search_service()
+        results = [None] * len(requests)
+        groups = group_indices(requests, lambda r: (r.model_type, r.limit))
+        for (model_type, limit), indices in groups.items():
+            try:
+                batch = await search_service.text_search_batch(
+                    [requests[i].query for i in indices],
+                    model_type=model_type,
+                    limit=limit,
+                )
+            except Exception as e:
+                # Fail only this group's callers, not the whole batch
+                logger.error(
+                    "Text search batch group failed",
+                    model=model_type.value,
+                    limit=limit,
+                    error=str(e),
+                )
+                batch = [e] * len(indices)
+            for i, result in zip(indices, batch):
+                results[i] = result
+        return results
+
     def get_model_status(self) -> Dict[str, Any]:
         """Get status of all models"""
         return {
@@ -97,6 +167,9 @@ class ModelManager:
         """Cleanup resources"""
         logger.info("Cleaning up ModelManager")
 
+        for dispatcher in self._dispatchers():
+            await dispatcher.stop()
+
         # Cleanup services
         if self.search_service:
             await self.search_service.cleanup()
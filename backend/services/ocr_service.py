@@ -5,6 +5,7 @@ OCR service for text extraction from images
 from typing import Union
 
 import structlog
+from core.inference import inference_pool
 from schemas.ocr import OCRData, OCRTextBlock
 
 logger = structlog.get_logger()
@@ -24,7 +25,18 @@ class OCRService:
         confidence_threshold: float = 0.5,
     ) -> OCRData:
         """Extract text from image using OCR"""
-        logger.info(
+        return await inference_pool.run(
+            self.extract_text_sync, image_source, language, confidence_threshold
+        )
+
+    def extract_text_sync(
+        self,
+        image_source: Union[str, bytes],
+        language: str = "en",
+        confidence_threshold: float = 0.5,
+    ) -> OCRData:
+        """Blocking OCR core, run on the inference pool"""
+        logger.debug(
             "OCR text extraction", language=language, confidence=confidence_threshold
         )
 
@@ -3,14 +3,21 @@ Result fusion service for combining search results from multiple models
 Inspired by VISIONE's winning approach
 """
 
-from typing import Any, Dict, List, Tuple
+import heapq
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Tuple
 
+import numpy as np
 import structlog
 from core.config import settings
 from schemas.search import SearchResult
 
 logger = structlog.get_logger()
 
+# Top-k selection keeps only ``limit`` candidates in a heap; nlargest matches
+# sorted(..., reverse=True)[:limit], ties included
+_by_score = attrgetter("score")
+
 
 class ResultFusionService:
     """
@@ -18,14 +25,18 @@ class ResultFusionService:
     Implements various fusion strategies used in VISIONE
     """
 
-    def __init__(self):
-        self.fusion_methods = {
-            "score": self._fuse_by_score,
-            "rank": self._fuse_by_rank,
-            "reciprocal_rank": self._fuse_by_reciprocal_rank,
-            "weighted": self._fuse_by_weighted_score,
-            "borda": self._fuse_by_borda_count,
-        }
+    RRF_K = 60  # VISIONE uses k=60
+    # RRF contributions by zero-based rank, for lists up to 10000 results
+    _RRF_TABLE = 1.0 / (RRF_K + np.arange(1, 10001))
+
+    # Fusion method name -> implementing method, resolved per call
+    FUSION_METHODS = {
+        "score": "_fuse_by_score",
+        "rank": "_fuse_by_rank",
+        "reciprocal_rank": "_fuse_by_reciprocal_rank",
+        "weighted": "_fuse_by_weighted_score",
+        "borda": "_fuse_by_borda_count",
+    }
 
     def fuse_results(
         self,
@@ -44,226 +55,174 @@ class ResultFusionService:
         Returns:
             Fused and ranked list of search results
         """
-        if not model_results:
-            return []
-
-        if len(model_results) == 1:
-            # Only one model, return its results
-            return list(model_results.values())[0][:limit]
+        # Models that returned nothing take no part in fusion
+        non_empty = [results for results in model_results.values() if results]
+        if len(non_empty) <= 1:
+            # At most one model has results, return them as they are
+            return non_empty[0][:limit] if non_empty else []
 
         # Use default method if none specified
         method = method or settings.FUSION_METHOD
 
-        if method not in self.fusion_methods:
+        if method not in self.FUSION_METHODS:
             logger.warning(f"Unknown fusion method {method}, using reciprocal_rank")
             method = "reciprocal_rank"
 
         logger.info(f"Fusing results using {method} method")
 
-        # Apply fusion method
-        fused_results = self.fusion_methods[method](model_results, limit)
-
-        # Post-process results
-        if settings.ENABLE_DUPLICATE_REMOVAL:
-            fused_results = self._remove_duplicates(fused_results, limit)
-
-        if settings.ENABLE_RESULT_SORTING:
-            fused_results = self._sort_results(fused_results)
-
-        return fused_results[:limit]
+        # Fusion methods return at most ``limit`` results, best first; all but
+        # score fusion key by link, and score fusion deduplicates itself
+        return getattr(self, self.FUSION_METHODS[method])(model_results, limit)
 
     def _fuse_by_score(
         self, model_results: Dict[str, List[SearchResult]], limit: int
     ) -> List[SearchResult]:
         """Fuse by taking the highest scores across all models"""
-        all_results = []
+        # Results keep their own scores, so they are reused as-is
+        all_results = [
+            result for results in model_results.values() for result in results
+        ]
 
-        for model_name, results in model_results.items():
-            for result in results:
-                # Create a copy with model information
-                fused_result = SearchResult(
-                    image_id=result.image_id,
-                    score=result.score,
-                    link=result.link,
-                    image_url=result.image_url,
-                    watch_url=result.watch_url,
-                    ocr_text=result.ocr_text,
-                    bbox=result.bbox,
-                    video_id=result.video_id,
-                    shot_index=result.shot_index,
-                    frame_stamp=result.frame_stamp,
-                    file_path=result.file_path,
-                )
-                all_results.append(fused_result)
+        if settings.ENABLE_DUPLICATE_REMOVAL:
+            # Keep each link's best result, filling up to limit unique links
+            ranked = sorted(all_results, key=_by_score, reverse=True)
+            return self._remove_duplicates(ranked, limit)
 
         # Sort by score and return top results
-        return sorted(all_results, key=lambda x: x.score, reverse=True)[:limit]
+        return heapq.nlargest(limit, all_results, key=_by_score)
 
     def _fuse_by_rank(
         self, model_results: Dict[str, List[SearchResult]], limit: int
     ) -> List[SearchResult]:
         """Fuse by rank position (lower rank = higher score)"""
-        rank_scores = {}
-
-        for model_name, results in model_results.items():
-            for rank, result in enumerate(results):
-                if result.link not in rank_scores:
-                    rank_scores[result.link] = {
-                        "result": result,
-                        "ranks": [],
-                        "models": [],
-                    }
-
-                rank_scores[result.link]["ranks"].append(rank + 1)
-                rank_scores[result.link]["models"].append(model_name)
+        first_seen, model_ids = self._link_ids(model_results)
+        ids = np.concatenate(model_ids)
+        ranks = np.concatenate([np.arange(1, len(i) + 1) for i in model_ids])
 
         # Calculate average rank for each result
-        fused_results = []
-        for link, data in rank_scores.items():
-            avg_rank = sum(data["ranks"]) / len(data["ranks"])
-            # Convert rank to score (lower rank = higher score)
-            score = 1.0 / (avg_rank + 1)
-
-            fused_result = SearchResult(
-                image_id=data["result"].image_id,
-                score=score,
-                link=data["result"].link,
-                image_url=data["result"].image_url,
-                watch_url=data["result"].watch_url,
-                ocr_text=data["result"].ocr_text,
-                bbox=data["result"].bbox,
-                video_id=data["result"].video_id,
-                shot_index=data["result"].shot_index,
-                frame_stamp=data["result"].frame_stamp,
-                file_path=data["result"].file_path,
-            )
-            fused_results.append(fused_result)
+        rank_totals = np.bincount(ids, weights=ranks, minlength=len(first_seen))
+        rank_counts = np.bincount(ids, minlength=len(first_seen))
+        avg_ranks = rank_totals / rank_counts
+        # Convert rank to score (lower rank = higher score)
+        return self._top_k(first_seen, 1.0 / (avg_ranks + 1), limit)
+
+    @staticmethod
+    def _link_ids(
+        model_results: Dict[str, List[SearchResult]],
+    ) -> Tuple[List[SearchResult], List[np.ndarray]]:
+        """
+        Map every link to a dense integer id in first-seen order.
 
-        return sorted(fused_results, key=lambda x: x.score, reverse=True)[:limit]
+        Returns the first result seen for each id and, per model, the ids of
+        its results in rank order. ``dict.fromkeys`` builds the id table at
+        its final size in one C-level pass; the accumulators downstream are
+        integer-indexed arrays.
+        """
+        all_results = [r for results in model_results.values() for r in results]
+        links = [r.link for r in all_results]
+        link_to_idx = {link: i for i, link in enumerate(dict.fromkeys(links))}
+        ids = np.fromiter(
+            map(link_to_idx.__getitem__, links), dtype=np.intp, count=len(links)
+        )
+
+        # Ids are assigned in first-seen order, so their first positions are too
+        _, first_positions = np.unique(ids, return_index=True)
+        first_seen = [all_results[i] for i in first_positions.tolist()]
+        bounds = np.cumsum([len(results) for results in model_results.values()])
+        model_ids = np.split(ids, bounds[:-1])
+
+        return first_seen, model_ids
+
+    @staticmethod
+    def _top_k(
+        first_seen: List[SearchResult], fused_scores: np.ndarray, limit: int
+    ) -> List[SearchResult]:
+        """Copy the ``limit`` best-scoring results with their fused scores"""
+        candidates = np.arange(len(fused_scores))
+        if 0 < limit < len(fused_scores):
+            # O(N) selection of the limit-th best score; keeping every link
+            # tied with it leaves the cut to the stable sort below
+            threshold = np.partition(fused_scores, -limit)[-limit]
+            candidates = np.flatnonzero(fused_scores >= threshold)
+        # Stable, so tied links keep first-seen order as with sorted()
+        order = np.argsort(-fused_scores[candidates], kind="stable")
+        top = candidates[order[: max(limit, 0)]]
+        # Already validated: copy with the fused score instead of rebuilding
+        return [
+            first_seen[i].model_copy(update={"score": float(fused_scores[i])})
+            for i in top.tolist()
+        ]
+
+    def _fuse_by_contribution(
+        self,
+        model_results: Dict[str, List[SearchResult]],
+        limit: int,
+        contribution: Callable[[str, List[SearchResult], np.ndarray], np.ndarray],
+    ) -> List[SearchResult]:
+        """
+        Sum per-model score contributions for each unique link with NumPy.
+
+        ``contribution`` returns one value per result of a model, given its
+        zero-based ranks. The first result seen for a link carries the fused
+        score.
+        """
+        first_seen, model_ids = self._link_ids(model_results)
+        values = [
+            contribution(model_name, results, np.arange(len(results)))
+            for model_name, results in model_results.items()
+        ]
+
+        # One weighted bincount over every model's contributions; it adds them
+        # in input order, like a per-result loop
+        fused_scores = np.bincount(
+            np.concatenate(model_ids),
+            weights=np.concatenate(values),
+            minlength=len(first_seen),
+        )
+        return self._top_k(first_seen, fused_scores, limit)
 
     def _fuse_by_reciprocal_rank(
         self, model_results: Dict[str, List[SearchResult]], limit: int
     ) -> List[SearchResult]:
         """Fuse using reciprocal rank fusion (RRF) - VISIONE's preferred method"""
-        rrf_scores = {}
 
-        for model_name, results in model_results.items():
-            for rank, result in enumerate(results):
-                if result.link not in rrf_scores:
-                    rrf_scores[result.link] = {
-                        "result": result,
-                        "rrf_score": 0.0,
-                        "models": [],
-                    }
-
-                # RRF formula: 1 / (k + rank)
-                k = 60  # VISIONE uses k=60
-                rrf_score = 1.0 / (k + rank + 1)
-                rrf_scores[result.link]["rrf_score"] += rrf_score
-                rrf_scores[result.link]["models"].append(model_name)
-
-        # Create fused results
-        fused_results = []
-        for link, data in rrf_scores.items():
-            fused_result = SearchResult(
-                image_id=data["result"].image_id,
-                score=data["rrf_score"],
-                link=data["result"].link,
-                image_url=data["result"].image_url,
-                watch_url=data["result"].watch_url,
-                ocr_text=data["result"].ocr_text,
-                bbox=data["result"].bbox,
-                video_id=data["result"].video_id,
-                shot_index=data["result"].shot_index,
-                frame_stamp=data["result"].frame_stamp,
-                file_path=data["result"].file_path,
-            )
-            fused_results.append(fused_result)
+        def rrf(model_name, results, ranks):
+            # RRF formula: 1 / (k + rank)
+            if len(ranks) <= len(self._RRF_TABLE):
+                return self._RRF_TABLE[: len(ranks)]
+            return 1.0 / (self.RRF_K + ranks + 1)
 
-        return sorted(fused_results, key=lambda x: x.score, reverse=True)[:limit]
+        return self._fuse_by_contribution(model_results, limit, rrf)
 
     def _fuse_by_weighted_score(
         self, model_results: Dict[str, List[SearchResult]], limit: int
     ) -> List[SearchResult]:
         """Fuse using weighted scores based on model priorities"""
-        weighted_scores = {}
+        # Model priority (higher number = higher priority) as a share of the total
+        total_priority = sum(settings.MODEL_PRIORITIES.values())
+        weights = {
+            model_name: settings.MODEL_PRIORITIES.get(model_name, 1) / total_priority
+            for model_name in model_results
+        }
 
-        for model_name, results in model_results.items():
-            # Get model priority (higher number = higher priority)
-            priority = settings.MODEL_PRIORITIES.get(model_name, 1)
-            weight = priority / sum(settings.MODEL_PRIORITIES.values())
-
-            for result in results:
-                if result.link not in weighted_scores:
-                    weighted_scores[result.link] = {
-                        "result": result,
-                        "weighted_score": 0.0,
-                        "models": [],
-                    }
-
-                weighted_scores[result.link]["weighted_score"] += result.score * weight
-                weighted_scores[result.link]["models"].append(model_name)
-
-        # Create fused results
-        fused_results = []
-        for link, data in weighted_scores.items():
-            fused_result = SearchResult(
-                image_id=data["result"].image_id,
-                score=data["weighted_score"],
-                link=data["result"].link,
-                image_url=data["result"].image_url,
-                watch_url=data["result"].watch_url,
-                ocr_text=data["result"].ocr_text,
-                bbox=data["result"].bbox,
-                video_id=data["result"].video_id,
-                shot_index=data["result"].shot_index,
-                frame_stamp=data["result"].frame_stamp,
-                file_path=data["result"].file_path,
+        def weighted(model_name, results, ranks):
+            scores = np.fromiter(
+                (result.score for result in results), dtype=float, count=len(results)
             )
-            fused_results.append(fused_result)
+            return scores * weights[model_name]
 
-        return sorted(fused_results, key=lambda x: x.score, reverse=True)[:limit]
+        return self._fuse_by_contribution(model_results, limit, weighted)
 
     def _fuse_by_borda_count(
         self, model_results: Dict[str, List[SearchResult]], limit: int
     ) -> List[SearchResult]:
         """Fuse using Borda count method"""
-        borda_scores = {}
 
-        for model_name, results in model_results.items():
-            max_rank = len(results)
-            for rank, result in enumerate(results):
-                if result.link not in borda_scores:
-                    borda_scores[result.link] = {
-                        "result": result,
-                        "borda_score": 0,
-                        "models": [],
-                    }
-
-                # Borda count: (max_rank - rank) points
-                borda_points = max_rank - rank
-                borda_scores[result.link]["borda_score"] += borda_points
-                borda_scores[result.link]["models"].append(model_name)
-
-        # Create fused results
-        fused_results = []
-        for link, data in borda_scores.items():
-            fused_result = SearchResult(
-                image_id=data["result"].image_id,
-                score=float(data["borda_score"]),
-                link=data["result"].link,
-                image_url=data["result"].image_url,
-                watch_url=data["result"].watch_url,
-                ocr_text=data["result"].ocr_text,
-                bbox=data["result"].bbox,
-                video_id=data["result"].video_id,
-                shot_index=data["result"].shot_index,
-                frame_stamp=data["result"].frame_stamp,
-                file_path=data["result"].file_path,
-            )
-            fused_results.append(fused_result)
+        def borda(model_name, results, ranks):
+            # Borda count: (max_rank - rank) points
+            return (len(results) - ranks).astype(float)
 
-        return sorted(fused_results, key=lambda x: x.score, reverse=True)[:limit]
+        return self._fuse_by_contribution(model_results, limit, borda)
 
     def _remove_duplicates(
         self, results: List[SearchResult], limit: int
@@ -273,20 +232,14 @@ class ResultFusionService:
         unique_results = []
 
         for result in results:
+            if len(unique_results) >= limit:
+                break
             if result.link not in seen_paths:
                 seen_paths.add(result.link)
                 unique_results.append(result)
-                if len(unique_results) >= limit:
-                    break
 
         return unique_results
 
-    def _sort_results(self, results: List[SearchResult]) -> List[SearchResult]:
-        """Sort results by score (highest first)"""
-        if settings.SORT_BY_SCORE:
-            return sorted(results, key=lambda x: x.score, reverse=True)
-        return results
-
     def get_fusion_stats(
         self, model_results: Dict[str, List[SearchResult]]
     ) -> Dict[str, Any]:
@@ -298,13 +251,24 @@ class ResultFusionService:
         }
 
         for model_name, results in model_results.items():
+            if not results:
+                stats["model_breakdown"][model_name] = {
+                    "result_count": 0,
+                    "avg_score": 0.0,
+                    "min_score": 0.0,
+                    "max_score": 0.0,
+                }
+                continue
+
+            # Read the scores once; NumPy reduces them without Python loops
+            scores = np.fromiter(
+                (r.score for r in results), dtype=float, count=len(results)
+            )
             stats["model_breakdown"][model_name] = {
                 "result_count": len(results),
-                "avg_score": (
-                    sum(r.score for r in results) / len(results) if results else 0.0
-                ),
-                "min_score": min(r.score for r in results) if results else 0.0,
-                "max_score": max(r.score for r in results) if results else 0.0,
+                "avg_score": float(scores.mean()),
+                "min_score": float(scores.min()),
+                "max_score": float(scores.max()),
             }
 
         return stats
@@ -9,7 +9,8 @@ from typing import List, Optional, Union
 
 import structlog
 from core.config import settings
-from schemas.common import ModelType, SearchLogic, SearchResult
+from core.inference import inference_pool
+from schemas.common import FallbackResults, ModelType, SearchLogic, SearchResult
 
 # Add parent directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -26,6 +27,7 @@ class SearchService:
 
     def __init__(self):
         self._faiss_engine = None
+        self._metadata_service = None
         self._models_loaded = False
         self._loading_lock = asyncio.Lock()
 
@@ -63,7 +65,8 @@ class SearchService:
                 else:
                     # Initialize the FAISS engine with available models
                     try:
-                        self._faiss_engine = MyFaiss(
+                        self._faiss_engine = await inference_pool.run(
+                            MyFaiss,
                             checkpoint_dir=checkpoint_dir,
                             dict_dir=dict_dir,
                         )
@@ -88,6 +91,15 @@ class SearchService:
                 logger.error(f"Failed to load search models: {e}")
                 self._models_loaded = False
 
+    async def warmup(self):
+        """Load the FAISS engine and run dummy queries through it"""
+        await self._ensure_models_loaded()
+        if self._faiss_engine is None:
+            return
+        await inference_pool.run(
+            self._faiss_engine.warmup, compile_encoders=settings.COMPILE_ENCODERS
+        )
+
     async def text_search(
         self, query: str, model_type: ModelType = ModelType.CLIP, limit: int = 20
     ) -> List[SearchResult]:
@@ -115,7 +127,8 @@ class SearchService:
                 # Use the specified model
                 logger.info(f"🔍 Calling FAISS engine.text_search with: text='{query}', k={limit}, model_type='{model_type.value}'")
                 logger.info(f"🔍 Model type enum: {model_type}, value: {model_type.value}")
-                scores, idxs, image_paths = self._faiss_engine.text_search(
+                scores, idxs, image_paths = await inference_pool.run(
+                    self._faiss_engine.text_search,
                     text=query, k=limit, model_type=model_type.value
                 )
                 logger.info(f"🔍 FAISS search returned: scores={len(scores)}, idxs={len(idxs)}, paths={len(image_paths)}")
@@ -127,67 +140,9 @@ class SearchService:
                 else:
                     logger.warning("🔍 No image paths returned from FAISS!")
 
-                results = []
-                # Set similarity threshold to filter out poor matches
-                # For CLIP models, scores above 0.2 are usually good matches (lowered from 0.3)
-                # For LongCLIP, scores above 1.0 are usually good matches (lowered to include L batches)
-                # For BEiT3, scores above 0.4 are usually good matches (lowered from 0.5)
-                if model_type in [ModelType.LONGCLIP, ModelType.CLIP2VIDEO]:
-                    similarity_threshold = 1.0
-                elif model_type == ModelType.BEIT3:
-                    similarity_threshold = 0.4
-                else:
-                    similarity_threshold = 0.2
-                
-                logger.info(f"🔍 Processing {len(scores)} search results with threshold {similarity_threshold}...")
-                for i, (score, idx, path) in enumerate(zip(scores, idxs, image_paths)):
-                    if path and score >= similarity_threshold:
-                        # Create proper image URL for frontend display
-                        # The path from id2img.json is already in the format "raw/keyframes/Keyframes_L21/keyframes/L21_V001/001.jpg"
-                        # So we just need to prepend "/data/" to make it accessible via the static file mount
-                        image_url = f"/data/{path}"
-
-                        # Extract folder and filename from the path
-                        # Path format: "raw/keyframes/Keyframes_L21/keyframes/L21_V001/001.jpg"
-                        # We want to extract: "L21_V001/001.jpg"
-                        file_path = None
-                        if path:
-                            path_parts = path.split("/")
-                            if len(path_parts) >= 3:
-                                # Get the last two parts: folder and filename
-                                file_path = f"{path_parts[-2]}/{path_parts[-1]}"
-
-                        result = SearchResult(
-                            image_id=f"{model_type.value}_{idx}",
-                            score=float(score),
-                            link=path,
-                            image_url=image_url,
-                            watch_url=None,
-                            ocr_text=None,
-                            file_path=file_path,
-                        )
-                        results.append(result)
-                        if i < 3:  # Log first 3 results for debugging
-                            logger.info(f"🔍 Result {i+1}: score={score:.4f}, path={path}, file_path={file_path}")
-                
-                logger.info(f"🔍 Created {len(results)} valid results from {len(scores)} raw results (threshold: {similarity_threshold})")
-
-                # If no results meet the threshold, return a message
-                if not results:
-                    logger.warning(f"🔍 No results met similarity threshold {similarity_threshold}. Dataset may not contain relevant content.")
-                    return []
-
-                # Remove duplicates and return results
-                unique_results = self._remove_duplicates(results, limit)
-                logger.info(f"🔍 After deduplication: {len(unique_results)} unique results")
-
-                # Enhance results with metadata
-                enhanced_results = await self._enhance_results_with_metadata(
-                    unique_results
+                return await self._build_text_results(
+                    scores, idxs, image_paths, model_type, limit
                 )
-                logger.info(f"🔍 Final enhanced results: {len(enhanced_results)} results")
-
-                return enhanced_results
 
         except ValueError as e:
             if "not available" in str(e).lower():
@@ -204,13 +159,115 @@ class SearchService:
             # Fallback to mock results
             return self._mock_search_results(limit, "text", query)
 
+    async def _build_text_results(
+        self, scores, idxs, image_paths, model_type: ModelType, limit: int
+    ) -> List[SearchResult]:
+        """Turn raw FAISS text-search hits into filtered, enhanced results"""
+        results = []
+        # Set similarity threshold to filter out poor matches
+        # For CLIP models, scores above 0.2 are usually good matches (lowered from 0.3)
+        # For LongCLIP, scores above 1.0 are usually good matches (lowered to include L batches)
+        # For BEiT3, scores above 0.4 are usually good matches (lowered from 0.5)
+        if model_type in [ModelType.LONGCLIP, ModelType.CLIP2VIDEO]:
+            similarity_threshold = 1.0
+        elif model_type == ModelType.BEIT3:
+            similarity_threshold = 0.4
+        else:
+            similarity_threshold = 0.2
+
+        logger.info(f"🔍 Processing {len(scores)} search results with threshold {similarity_threshold}...")
+        for i, (score, idx, path) in enumerate(zip(scores, idxs, image_paths)):
+            if path and score >= similarity_threshold:
+                # Create proper image URL for frontend display
+                # The path from id2img.json is already in the format "raw/keyframes/Keyframes_L21/keyframes/L21_V001/001.jpg"
+                # So we just need to prepend "/data/" to make it accessible via the static file mount
+                image_url = f"/data/{path}"
+
+                # Extract folder and filename from the path
+                # Path format: "raw/keyframes/Keyframes_L21/keyframes/L21_V001/001.jpg"
+                # We want to extract: "L21_V001/001.jpg"
+                file_path = None
+                if path:
+                    path_parts = path.split("/")
+                    if len(path_parts) >= 3:
+                        # Get the last two parts: folder and filename
+                        file_path = f"{path_parts[-2]}/{path_parts[-1]}"
+
+                result = SearchResult(
+                    image_id=f"{model_type.value}_{idx}",
+                    score=float(score),
+                    link=path,
+                    image_url=image_url,
+                    watch_url=None,
+                    ocr_text=None,
+                    file_path=file_path,
+                )
+                results.append(result)
+                if i < 3:  # Log first 3 results for debugging
+                    logger.info(f"🔍 Result {i+1}: score={score:.4f}, path={path}, file_path={file_path}")
+
+        logger.info(f"🔍 Created {len(results)} valid results from {len(scores)} raw results (threshold: {similarity_threshold})")
+
+        # If no results meet the threshold, return a message
+        if not results:
+            logger.warning(f"🔍 No results met similarity threshold {similarity_threshold}. Dataset may not contain relevant content.")
+            return []
+
+        # Remove duplicates and return results
+        unique_results = self._remove_duplicates(results, limit)
+        logger.info(f"🔍 After deduplication: {len(unique_results)} unique results")
+
+        # Enhance results with metadata
+        enhanced_results = await self._enhance_results_with_metadata(
+            unique_results
+        )
+        logger.info(f"🔍 Final enhanced results: {len(enhanced_results)} results")
+
+        return enhanced_results
+
+    async def text_search_batch(
+        self,
+        queries: List[str],
+        model_type: ModelType = ModelType.CLIP,
+        limit: int = 20,
+    ) -> List[List[SearchResult]]:
+        """Perform text search for several queries sharing model and limit
+
+        Queries are encoded together and the FAISS index is searched once with
+        an (N, d) matrix; the per-query path is kept for ALL/mock mode and as
+        a fallback if the batched call fails.
+        """
+        await self._ensure_models_loaded()
+
+        if (
+            self._faiss_engine is None
+            or model_type == ModelType.ALL
+            or len(queries) == 1
+        ):
+            return [await self.text_search(query, model_type, limit) for query in queries]
+
+        try:
+            hits = await inference_pool.run(
+                self._faiss_engine.text_search_batch,
+                texts=queries, k=limit, model_type=model_type.value
+            )
+        except Exception as e:
+            logger.warning(f"🔍 Batched text search failed, searching per query: {e}")
+            return [await self.text_search(query, model_type, limit) for query in queries]
+
+        return [
+            await self._build_text_results(scores, idxs, image_paths, model_type, limit)
+            for scores, idxs, image_paths in hits
+        ]
+
     async def _search_all_models(self, query: str, limit: int) -> List[SearchResult]:
         """Search across all available models and combine results"""
         all_results = []
 
         # Search with CLIP
         try:
-            scores, idxs, image_paths = self._faiss_engine.text_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.text_search,
                 text=query, k=limit, model_type="clip"
             )
             for i, (score, idx, path) in enumerate(zip(scores, idxs, image_paths)):
@@ -240,7 +297,8 @@ class SearchService:
 
         # Search with LongCLIP if available
         try:
-            scores, idxs, image_paths = self._faiss_engine.text_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.text_search,
                 text=query, k=limit, model_type="longclip"
             )
             for i, (score, idx, path) in enumerate(zip(scores, idxs, image_paths)):
@@ -270,7 +328,8 @@ class SearchService:
 
         # Search with CLIP2Video if available
         try:
-            scores, idxs, image_paths = self._faiss_engine.text_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.text_search,
                 text=query, k=limit, model_type="clip2video"
             )
             for i, (score, idx, path) in enumerate(zip(scores, idxs, image_paths)):
@@ -301,7 +360,8 @@ class SearchService:
         # Search with BEIT3 if available
         try:
             logger.info("🔍 Multi-model: Searching with BEIT3...")
-            scores, idxs, image_paths = self._faiss_engine.text_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.text_search,
                 text=query, k=limit, model_type="beit3"
             )
             logger.info(f"🔍 Multi-model BEIT3: scores={len(scores)}, idxs={len(idxs)}, paths={len(image_paths)}")
@@ -392,21 +452,13 @@ class SearchService:
                 metadata = self._metadata_service.get_frame_metadata(result.image_id)
 
                 if metadata:
-                    # Enhance the result with metadata
-                    enhanced_result = SearchResult(
-                        image_id=result.image_id,
-                        score=result.score,
-                        link=result.link,
-                        image_url=result.image_url,
-                        watch_url=result.watch_url,
-                        ocr_text=result.ocr_text,
-                        bbox=result.bbox,
-                        video_id=metadata.get("video_info", {}).get("filename", ""),
-                        shot_index=metadata.get("keyframe_info", {}).get("shot_index"),
-                        frame_stamp=metadata.get("keyframe_info", {}).get("timestamp"),
-                        # Add additional metadata fields if needed
-                        metadata=metadata,
-                    )
+                    # Enhance the result with metadata; the result was already
+                    # validated, so copy it instead of validating it again
+                    enhanced_result = result.model_copy(update={
+                        "video_id": metadata.get("video_info", {}).get("filename", ""),
+                        "shot_index": metadata.get("keyframe_info", {}).get("shot_index"),
+                        "frame_stamp": metadata.get("keyframe_info", {}).get("timestamp"),
+                    })
                 else:
                     enhanced_result = result
 
@@ -437,7 +489,8 @@ class SearchService:
                 return await self._image_search_all_models(image_source, limit)
             else:
                 # Use the specified model
-                scores, idxs, image_paths = self._faiss_engine.image_search(
+                scores, idxs, image_paths = await inference_pool.run(
+                    self._faiss_engine.image_search,
                     k=limit,
                     model_type=model_type.value,
                     image_id=None,
@@ -494,7 +547,8 @@ class SearchService:
 
         # Search with CLIP
         try:
-            scores, idxs, image_paths = self._faiss_engine.image_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.image_search,
                 k=limit,
                 model_type="clip",
                 image_id=None,
@@ -527,7 +581,8 @@ class SearchService:
 
         # Search with LongCLIP if available
         try:
-            scores, idxs, image_paths = self._faiss_engine.image_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.image_search,
                 k=limit,
                 model_type="longclip",
                 image_id=None,
@@ -560,7 +615,8 @@ class SearchService:
 
         # Search with CLIP2Video if available
         try:
-            scores, idxs, image_paths = self._faiss_engine.image_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.image_search,
                 k=limit,
                 model_type="clip2video",
                 image_id=None,
@@ -593,7 +649,8 @@ class SearchService:
 
         # Search with BEIT3 if available
         try:
-            scores, idxs, image_paths = self._faiss_engine.image_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.image_search,
                 k=limit,
                 model_type="beit3",
                 image_id=None,
@@ -676,7 +733,8 @@ class SearchService:
                 except (ValueError, IndexError):
                     numeric_id = 0
 
-                scores, idxs, image_paths = self._faiss_engine.image_search(
+                scores, idxs, image_paths = await inference_pool.run(
+                    self._faiss_engine.image_search,
                     k=limit,
                     model_type=model_type.value,
                     image_id=numeric_id,
@@ -736,7 +794,8 @@ class SearchService:
 
         # Search with CLIP
         try:
-            scores, idxs, image_paths = self._faiss_engine.image_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.image_search,
                 k=limit,
                 model_type="clip",
                 image_id=numeric_id,
@@ -769,7 +828,8 @@ class SearchService:
 
         # Search with LongCLIP if available
         try:
-            scores, idxs, image_paths = self._faiss_engine.image_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.image_search,
                 k=limit,
                 model_type="longclip",
                 image_id=numeric_id,
@@ -802,7 +862,8 @@ class SearchService:
 
         # Search with CLIP2Video if available
         try:
-            scores, idxs, image_paths = self._faiss_engine.image_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.image_search,
                 k=limit,
                 model_type="clip2video",
                 image_id=numeric_id,
@@ -835,7 +896,8 @@ class SearchService:
 
         # Search with BEIT3 if available
         try:
-            scores, idxs, image_paths = self._faiss_engine.image_search(
+            scores, idxs, image_paths = await inference_pool.run(
+                self._faiss_engine.image_search,
                 k=limit,
                 model_type="beit3",
                 image_id=numeric_id,
@@ -903,7 +965,7 @@ class SearchService:
         logger.info(
             "Generated mock search results", search_type=search_type, count=len(results)
         )
-        return results
+        return FallbackResults(results)
 
     async def cleanup(self):
         """Cleanup resources"""
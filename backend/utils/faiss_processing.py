@@ -2,6 +2,7 @@ import base64
 import io
 import json
 import os
+import re
 import sys
 from pathlib import Path
 from urllib.parse import urlparse
@@ -13,6 +14,9 @@ import torch
 import torch.nn.functional as F
 from PIL import Image
 
+# Sentence chunks ending in ., !, ?, : or ;, then any unterminated tail
+_SENTENCE_RE = re.compile(r"[^.!?:;]*[.!?:;]|[^.!?:;]+\Z")
+
 # Add the current directory to the path for local imports
 current_dir = os.path.dirname(__file__)
 if current_dir not in sys.path:
@@ -82,10 +86,14 @@ class MyFaiss:
         print("Loading CLIP model...")
         if clip_ckpt_path and os.path.exists(clip_ckpt_path):
             # Load from custom checkpoint
-            self.clip_model, _ = clip.load(clip_ckpt_path, device=self.device)
+            self.clip_model, self.clip_preprocess_fn = clip.load(
+                clip_ckpt_path, device=self.device
+            )
         else:
             # Load default CLIP model
-            self.clip_model, _ = clip.load("ViT-B/32", device=self.device)
+            self.clip_model, self.clip_preprocess_fn = clip.load(
+                "ViT-B/32", device=self.device
+            )
         self.clip_model.eval()
         print("CLIP model loaded:", type(self.clip_model))
 
@@ -128,9 +136,8 @@ class MyFaiss:
 
     def clip_preprocess(self, image):
         """CLIP image preprocessing"""
-        # Use the standard CLIP preprocessing
-        _, preprocess = clip.load("ViT-B/32", device=self.device)
-        return preprocess(image)
+        # The transform returned alongside the model when it was loaded
+        return self.clip_preprocess_fn(image)
 
     def load_image_source(self, image_source):
         """Load image from various sources (URL, local path, bytes, file-like)"""
@@ -328,15 +335,7 @@ class MyFaiss:
             return text
 
         # Split into sentences (roughly by periods and common Vietnamese sentence endings)
-        sentences = []
-        current = ""
-        for char in text:
-            current += char
-            if char in [".", "!", "?", ":", ";"]:
-                sentences.append(current.strip())
-                current = ""
-        if current.strip():
-            sentences.append(current.strip())
+        sentences = [s.strip() for s in _SENTENCE_RE.findall(text) if s.strip()]
 
         # If we have sentences, prioritize the first and last ones
         if len(sentences) > 1:
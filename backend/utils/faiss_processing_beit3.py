@@ -3,14 +3,18 @@ import io
 import json
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
 import clip
 import faiss
+import faiss.contrib.torch_utils  # lets GPU indexes search CUDA tensors in place
 import numpy as np
 import torch
 import torch.nn.functional as F
+from cachetools import LRUCache
 from PIL import Image
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
@@ -30,6 +34,9 @@ from translate_vi2en import Translation
 
 DATA_ROOT = pm.root_data  # Use the new path resolver
 
+# Videos whose normalized features stay on the device between temporal queries
+VIDEO_FEATURES_CACHE_SIZE = 128
+
 # ========================================
 # LongCLIP Wrapper
 # ========================================
@@ -102,19 +109,31 @@ class MyFaiss:
         # ============================================================
         # LOADING PHASE
         # ============================================================
+        # Indexes are mirrored onto the GPU(s) when FAISS was built with GPU
+        # support; CPU-only builds report 0 GPUs and keep the CPU indexes
+        self.num_gpus = faiss.get_num_gpus()
+        self._gpu_res = faiss.StandardGpuResources() if self.num_gpus == 1 else None
+
         self.index_clip = self.load_bin_file(bin_clip_file)
         self.index_longclip = self.load_bin_file(bin_longclip_file)
         self.index_beit3 = self.load_bin_file(bin_beit3_file)
         # self.index_clip2video = self.load_bin_file(bin_clip2video_file)
 
         self.id2img = self.load_json_file(id2img_json)
+        self.id2img_paths, self.id2img_present = self.build_id2img_lookup(self.id2img)
+
+        # (model_type, video_id) -> normalized device features
+        self._video_features = LRUCache(maxsize=VIDEO_FEATURES_CACHE_SIZE)
+        self._video_features_lock = threading.Lock()
         # self.id2shot = self.load_json_file(id2shot_json)
 
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
 
         # ===== Load CLIP ViT-B/32 =====
         print("Loading CLIP model...")
-        self.clip_model, _ = clip.load(clip_ckpt_path, device=self.device)
+        self.clip_model, self.clip_preprocess_fn = clip.load(
+            clip_ckpt_path, device=self.device
+        )
         self.clip_model.eval()
         print("CLIP model loaded:", type(self.clip_model))
 
@@ -169,10 +188,83 @@ class MyFaiss:
             js = json.load(f)
         return {int(k): v for k, v in js.items()}
 
+    def build_id2img_lookup(self, id2img):
+        """Object array of image paths indexed by FAISS id, plus a presence mask"""
+        size = max(id2img, default=-1) + 1
+        paths = np.full(size, None, dtype=object)
+        present = np.zeros(size, dtype=bool)
+        ids = np.fromiter(id2img.keys(), dtype=np.int64, count=len(id2img))
+        paths[ids] = np.fromiter(id2img.values(), dtype=object, count=len(id2img))
+        present[ids] = True
+        return paths, present
+
+    def lookup_image_paths(self, idxs):
+        """Image paths of the FAISS ids in ``idxs`` that are in id2img, in order"""
+        idxs = np.asarray(idxs, dtype=np.int64)
+        found = (idxs >= 0) & (idxs < len(self.id2img_paths))
+        found[found] = self.id2img_present[idxs[found]]
+        return self.id2img_paths[idxs[found]].tolist()
+
+    def clip_preprocess(self, image):
+        """CLIP image preprocessing"""
+        # The transform returned alongside the model when it was loaded
+        return self.clip_preprocess_fn(image)
+
     def load_bin_file(self, bin_file: str):
-        return faiss.read_index(bin_file)
+        index = faiss.read_index(bin_file)
+        if self.num_gpus == 0:
+            return index
+        try:
+            if self.num_gpus > 1:
+                # One replica per GPU, queries are split across them
+                return faiss.index_cpu_to_all_gpus(index)
+            return faiss.index_cpu_to_gpu(self._gpu_res, 0, index)
+        except Exception as e:
+            # Index types without a GPU implementation stay on the CPU
+            print(f"Keeping {os.path.basename(bin_file)} on CPU: {e}")
+            return index
+
+    def search_index(self, index, features, k):
+        """
+        Search ``index`` with numpy or torch query features.
+
+        CUDA tensors are handed to GPU indexes as they are, so the queries
+        never round-trip through host memory; anything else is searched as
+        a float32 numpy array. Returns numpy (scores, idxs) either way.
+        """
+        if torch.is_tensor(features):
+            features = features.detach().float()
+            if features.is_cuda and hasattr(index, "getDevice"):
+                scores, idxs = index.search(features.contiguous(), k)
+                return scores.cpu().numpy(), idxs.cpu().numpy()
+            features = features.cpu().numpy()
+        return index.search(np.ascontiguousarray(features, dtype=np.float32), k)
 
     def load_video_features(self, model_type: str, video_id: str):
+        key = (model_type, video_id)
+        features = self._cached_video_features(key)
+        if features is None:
+            features = self.features_to_device(
+                self.read_video_features(model_type, video_id)
+            )
+            self._cache_video_features(key, features)
+        return features
+
+    def _cached_video_features(self, key):
+        with self._video_features_lock:
+            return self._video_features.get(key)
+
+    def _cache_video_features(self, key, features):
+        with self._video_features_lock:
+            self._video_features[key] = features
+
+    def clear_cache(self):
+        """Drop cached video features, freeing their device memory"""
+        with self._video_features_lock:
+            self._video_features.clear()
+
+    def read_video_features(self, model_type: str, video_id: str):
+        """Host tensor of a video's features, pinned for async upload on CUDA"""
         if model_type == "clip":
             feature_path = os.path.join(
                 FEATURE_ROOT, f"features_clip/features/{video_id}.npy"
@@ -193,11 +285,46 @@ class MyFaiss:
                 f"features-clip2video/features/{video_id}.npy",
             )
 
-        arr = np.load(feature_path).astype(np.float32)
-        features = torch.from_numpy(arr).to(self.device)
-        features = F.normalize(features, dim=-1)
+        # Memory-mapped, so astype makes the only host copy
+        arr = np.load(feature_path, mmap_mode="r").astype(np.float32)
+        features = torch.from_numpy(arr)
+        if self.device == "cuda":
+            features = features.pin_memory()
         return features
 
+    def features_to_device(self, features):
+        """Upload host features without blocking and L2-normalize them"""
+        features = features.to(self.device, non_blocking=True)
+        return F.normalize(features, dim=-1)
+
+    def iter_video_features(self, model_type: str, video_ids):
+        """
+        Yield (video_id, features) for each video, reading the next uncached
+        video's .npy in a background thread while the caller works on the
+        current one. features is None when a video's features cannot be loaded.
+        """
+        cached = [self._cached_video_features((model_type, v)) for v in video_ids]
+        misses = iter([v for v, f in zip(video_ids, cached) if f is None])
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+
+            def read_next_miss():
+                video_id = next(misses, None)
+                if video_id is None:
+                    return None
+                return pool.submit(self.read_video_features, model_type, video_id)
+
+            pending = read_next_miss()
+            for video_id, features in zip(video_ids, cached):
+                if features is None:
+                    current, pending = pending, read_next_miss()
+                    try:
+                        features = self.features_to_device(current.result())
+                        self._cache_video_features((model_type, video_id), features)
+                    except Exception:
+                        features = None
+                yield video_id, features
+
     def load_image_source(self, source):
         """source: local path | http(s) URL | bytes | file-like | data URL -> PIL.Image(RGB)"""
         if hasattr(source, "read"):  # file-like
@@ -295,7 +422,8 @@ class MyFaiss:
                     img_tensor = (
                         self.clip_preprocess(pil_img).unsqueeze(0).to(self.device)
                     )
-                    q = self.clip_model.encode_image(img_tensor).float().cpu().numpy()
+                    # fp16 on CUDA (clip.load keeps half weights there)
+                    q = self.clip_model.encode_image(img_tensor)
             else:
                 # LongCLIP: truyền kiểu phù hợp cho wrapper (str | file-like | bytes)
                 src = image_source
@@ -319,12 +447,17 @@ class MyFaiss:
                     q = q[None, :]
 
         # normalize & search
-        q = q / (np.linalg.norm(q, axis=-1, keepdims=True) + 1e-12)
-        scores, idxs = index.search(q, k=k)
-        scores = scores.flatten()
-        idxs = idxs.flatten()
-
-        image_paths = [self.id2img.get(int(i)) for i in idxs if int(i) in self.id2img]
+        if torch.is_tensor(q):
+            q = F.normalize(q.float(), dim=-1)
+        else:
+            # Own float32 copy (q may view features_store), normalized in place
+            q = np.array(q, dtype=np.float32, order="C")
+            faiss.normalize_L2(q)
+        scores, idxs = self.search_index(index, q, k)
+        scores = scores.reshape(-1)
+        idxs = idxs.reshape(-1)
+
+        image_paths = self.lookup_image_paths(idxs)
         return scores, idxs, image_paths
 
     def text_search(self, text, k, model_type):
@@ -345,7 +478,6 @@ class MyFaiss:
             tokens = clip.tokenize([text]).to(self.device)
             text_features = self.clip_model.encode_text(tokens)
             text_features /= text_features.norm(dim=-1, keepdim=True)
-            text_features = text_features.cpu().detach().numpy().astype(np.float32)
         elif model_type == "longclip":
             # class LongCLIP trong features-longclip/model.py đã có sẵn encode_text
             text_features = self.longclip_model.encode_text(text)
@@ -377,14 +509,104 @@ class MyFaiss:
         elif model_type == "clip2video":
             index_chosen = self.index_clip2video
 
-        scores, idxs = index_chosen.search(text_features, k=k)
-        scores = scores.flatten()
-        idxs = idxs.flatten()
+        scores, idxs = self.search_index(index_chosen, text_features, k)
+        scores = scores.reshape(-1)
+        idxs = idxs.reshape(-1)
 
         #### GET INFOS KEYFRAMES_ID FOR OTHER MODELS AND INFOS SHOTS FOR CLIP2VIDEO #####
-        image_paths = [self.id2img.get(int(i)) for i in idxs if int(i) in self.id2img]
+        image_paths = self.lookup_image_paths(idxs)
         return scores, idxs, image_paths
 
+    def warmup(self, compile_encoders=False, rounds=3):
+        """
+        Run dummy queries through every loaded encoder and FAISS index so the
+        first real request does not pay for CUDA/cuDNN autotuning or for
+        paging the indexes into memory.
+
+        Args:
+            compile_encoders (bool): wrap CLIP encode_text with torch.compile
+            rounds (int): number of dummy encoder passes per model
+        """
+        if compile_encoders and hasattr(torch, "compile"):
+            try:
+                self.clip_model.encode_text = torch.compile(
+                    self.clip_model.encode_text, mode="reduce-overhead"
+                )
+            except Exception as e:
+                print(f"torch.compile unavailable for CLIP: {e}")
+
+        encoders = [
+            ("clip", self._warmup_clip),
+            ("longclip", lambda: self.longclip_model.encode_text("warmup")),
+        ]
+        if self.beit3_model is not None:
+            encoders.append(("beit3", lambda: self.beit3_model.encode_text("warmup")))
+
+        for name, encode in encoders:
+            try:
+                for _ in range(rounds):
+                    encode()
+            except Exception as e:
+                print(f"Warmup failed for {name}: {e}")
+
+        for index in (self.index_clip, self.index_longclip, self.index_beit3):
+            if index is not None and index.ntotal > 0:
+                index.search(np.zeros((1, index.d), dtype=np.float32), 10)
+
+    def _warmup_clip(self):
+        tokens = clip.tokenize(["warmup"]).to(self.device)
+        with torch.no_grad():
+            self.clip_model.encode_text(tokens)
+
+    def text_search_batch(self, texts, k, model_type):
+        """
+        Batched variant of text_search for several queries on one model.
+
+        Args:
+            texts (list): raw query strings
+            k (int): number of hits per query
+            model_type (str): "clip", "longclip" or "beit3"
+
+        Returns:
+            list of (scores, idx_image, image_paths) tuples, one per query, in
+            the same format as text_search
+        """
+        if model_type not in ("clip", "longclip") and not (
+            model_type == "beit3" and self.beit3_model is not None
+        ):
+            # No batched encoder for this model: fall back to per-query search
+            return [self.text_search(text, k, model_type) for text in texts]
+
+        texts = [self.translator(text) for text in texts]
+
+        ##### TEXT FEATURES EXTRACTING #####
+        if model_type == "clip":
+            # One forward pass for the whole batch
+            tokens = clip.tokenize(texts).to(self.device)
+            with torch.no_grad():
+                text_features = self.clip_model.encode_text(tokens)
+            text_features /= text_features.norm(dim=-1, keepdim=True)
+            index_chosen = self.index_clip
+        elif model_type == "longclip":
+            text_features = np.vstack(
+                [np.reshape(self.longclip_model.encode_text(t), (1, -1)) for t in texts]
+            )
+            index_chosen = self.index_longclip
+        else:
+            text_features = np.vstack(
+                [np.reshape(self.beit3_model.encode_text(t), (1, -1)) for t in texts]
+            )
+            index_chosen = self.index_beit3
+
+        ##### SEARCHING #####
+        scores, idxs = self.search_index(index_chosen, text_features, k)
+
+        hits = []
+        for row_scores, row_idxs in zip(scores, idxs):
+            image_paths = self.lookup_image_paths(row_idxs)
+            hits.append((row_scores, row_idxs, image_paths))
+        return hits
+
     def temporal_search(
         self,
         text,
@@ -507,11 +729,13 @@ class MyFaiss:
         candidate_videos = []
         seen = set()
 
-        for sentence, text_feat_numpy in zip(sentences, text_feats_numpy):
-            scores, idxs = index_chosen.search(text_feat_numpy, k=topk_per_sentence)
-            scores = scores.flatten()
-            idxs = idxs.flatten()
+        # One batched search for all sentences, one row of hits per sentence
+        queries = np.vstack([np.reshape(f, (1, -1)) for f in text_feats_numpy])
+        scores_all, idxs_all = self.search_index(
+            index_chosen, queries, topk_per_sentence
+        )
 
+        for sentence, scores, idxs in zip(sentences, scores_all, idxs_all):
             ranked_units = []
             for score, idx in zip(scores, idxs):
                 img_path = self.id2img.get(int(idx))
@@ -550,41 +774,41 @@ class MyFaiss:
 
         # 1.4 Temporal DP per video
         results = []
+        text_feats = torch.stack(text_feats_torch, dim=0)  # (M, D)
 
-        for video_id in candidate_videos:
-            try:
-                video_features = self.load_video_features(model_type, video_id)
-            except Exception:
-                continue
-            if video_features.numel() == 0:
+        for video_id, video_features in self.iter_video_features(
+            model_type, candidate_videos
+        ):
+            if video_features is None or video_features.numel() == 0:
                 continue
 
             N = video_features.shape[0]
             if N < M:
                 continue
 
-            # Compute similarity matrix
-            sim_list = []
-            for text_feat_torch in text_feats_torch:
-                sims = (text_feat_torch @ video_features.T) * 0.5 + 0.5
-                sim_list.append(sims)
-
-            # Normalize per-sentence results to [0, 1]
-            norm_sim_list = []
-            for sims in sim_list:
-                smin = sims.min()
-                smax = sims.max()
-                if (smax - smin) < 1e-6:
-                    norm = torch.zeros_like(sims)
-                else:
-                    norm = (sims - smin) / (smax - smin)
-                norm_sim_list.append(norm)
+            # Compute similarity matrix, one row per sentence, in one matmul
+            sims = (text_feats @ video_features.T) * 0.5 + 0.5  # (M, N)
+
+            # Normalize per-sentence results to [0, 1]; flat rows become zeros
+            smin = sims.amin(dim=1, keepdim=True)
+            srange = sims.amax(dim=1, keepdim=True) - smin
+            norm_sim_list = torch.where(
+                srange < 1e-6, torch.zeros_like(sims), (sims - smin) / srange
+            )
 
             # Build anchor bonus from per-sentence hits for THIS video
             anchor_top = 5
             anchor_boost = 0.10
             anchor_window = 2
             bonus_list = [torch.zeros(N, device=self.device) for _ in range(M)]
+            # Bonus for offsets -anchor_window..anchor_window around a hit
+            decay_kernel = torch.tensor(
+                [
+                    anchor_boost * (1.0 - abs(o) / (anchor_window + 1.0))
+                    for o in range(-anchor_window, anchor_window + 1)
+                ],
+                device=self.device,
+            )
 
             for i in range(M):
                 hits = [
@@ -602,14 +826,10 @@ class MyFaiss:
                         if 0 <= j < N:
                             L = max(0, j - anchor_window)
                             R = min(N, j + anchor_window + 1)
-                            for t in range(L, R):
-                                decay = 1.0 - (abs(t - j) / (anchor_window + 1.0))
-                                bonus_list[i][t] = torch.maximum(
-                                    bonus_list[i][t],
-                                    torch.tensor(
-                                        anchor_boost * decay, device=self.device
-                                    ),
-                                )
+                            kL = L - (j - anchor_window)
+                            bonus_list[i][L:R] = torch.maximum(
+                                bonus_list[i][L:R], decay_kernel[kL : kL + R - L]
+                            )
                     except Exception:
                         continue
             work_sim_list = [norm_sim_list[i] + bonus_list[i] for i in range(M)]
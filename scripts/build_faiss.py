@@ -193,7 +193,7 @@ class FAISSIndexBuilder:
         # Save combined index
         index_path = os.path.join(output_dir, f"faiss_{feature_type}_combined.bin")
         metadata_path = os.path.join(
-            output_dir, f"metadata_{feature_type}_combined.json"
+            output_dir, f"metadata_{feature_type}_combined.npy"
         )
         faiss_index.save_index(index_path, metadata_path)
 
@@ -256,7 +256,7 @@ def main():
     )
     parser.add_argument(
         "--index-type",
-        choices=["flat", "ivf", "ivfpq"],
+        choices=["flat", "ivf", "ivfpq", "hnsw", "sq8", "fp16"],
         default="flat",
         help="FAISS index type",
     )
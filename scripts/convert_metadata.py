@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Convert id2img.json into the memory-mapped id2img.npy read at backend startup
+"""
+
+import argparse
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from services.metadata_service import convert_id2img
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Convert id2img.json to a memory-mappable id2img.npy"
+    )
+    parser.add_argument("id2img", help="Path to id2img.json")
+    parser.add_argument(
+        "--output", "-o", help="Output .npy path (default: next to the JSON)"
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.id2img):
+        print(f"Not found: {args.id2img}")
+        sys.exit(1)
+
+    output = convert_id2img(args.id2img, args.output)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
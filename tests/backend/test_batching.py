@@ -0,0 +1,141 @@
+"""
+Tests for the request micro-batching dispatcher
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from core.batching import BatchedDispatcher, group_indices
+from schemas.common import ModelType
+from schemas.search import TextSearchRequest
+from services.model_manager import ModelManager
+
+
+def test_group_indices():
+    """Test payloads are grouped by key preserving order"""
+    groups = group_indices(["a1", "b1", "a2"], lambda p: p[0])
+    assert groups == {"a": [0, 2], "b": [1]}
+
+
+def test_concurrent_submits_share_a_batch():
+    """Test concurrent requests are dispatched as one batch"""
+    batches = []
+
+    async def batch_fn(payloads):
+        batches.append(list(payloads))
+        return [p * 2 for p in payloads]
+
+    async def run():
+        dispatcher = BatchedDispatcher(batch_fn, max_batch_size=8, max_wait_ms=20)
+        await dispatcher.start()
+        try:
+            return await asyncio.gather(*(dispatcher.submit(i) for i in range(5)))
+        finally:
+            await dispatcher.stop()
+
+    results = asyncio.run(run())
+
+    assert results == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+def test_batch_size_is_capped():
+    """Test batches never exceed max_batch_size"""
+    batches = []
+
+    async def batch_fn(payloads):
+        batches.append(len(payloads))
+        return payloads
+
+    async def run():
+        dispatcher = BatchedDispatcher(batch_fn, max_batch_size=2, max_wait_ms=20)
+        await dispatcher.start()
+        try:
+            await asyncio.gather(*(dispatcher.submit(i) for i in range(5)))
+        finally:
+            await dispatcher.stop()
+
+    asyncio.run(run())
+
+    assert max(batches) <= 2
+    assert sum(batches) == 5
+
+
+def test_batch_errors_propagate_to_waiters():
+    """Test a failing batch raises in every waiting caller"""
+
+    async def batch_fn(payloads):
+        raise ValueError("boom")
+
+    async def run():
+        dispatcher = BatchedDispatcher(batch_fn, max_wait_ms=5)
+        await dispatcher.start()
+        try:
+            await dispatcher.submit("x")
+        finally:
+            await dispatcher.stop()
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def test_exception_results_fail_only_their_caller():
+    """Test an exception in one result slot is raised in that caller only"""
+
+    async def batch_fn(payloads):
+        return [ValueError(p) if p == "bad" else p for p in payloads]
+
+    async def run():
+        dispatcher = BatchedDispatcher(batch_fn, max_batch_size=8, max_wait_ms=20)
+        await dispatcher.start()
+        try:
+            return await asyncio.gather(
+                *(dispatcher.submit(p) for p in ("ok", "bad", "fine")),
+                return_exceptions=True,
+            )
+        finally:
+            await dispatcher.stop()
+
+    ok, bad, fine = asyncio.run(run())
+
+    assert (ok, fine) == ("ok", "fine")
+    assert isinstance(bad, ValueError)
+
+
+def test_text_search_batch_isolates_failing_groups():
+    """Test a failing (model, limit) group does not fail the other groups"""
+
+    class FakeSearchService:
+        async def text_search_batch(self, queries, model_type, limit):
+            if model_type == ModelType.BEIT3:
+                raise RuntimeError("index missing")
+            return [[query] for query in queries]
+
+    manager = ModelManager()
+    manager._models_loaded = True
+    manager.search_service = FakeSearchService()
+    requests = [
+        TextSearchRequest(query="a", model_type=ModelType.CLIP),
+        TextSearchRequest(query="b", model_type=ModelType.BEIT3),
+        TextSearchRequest(query="c", model_type=ModelType.CLIP),
+    ]
+
+    a, b, c = asyncio.run(manager._text_search_batch(requests))
+
+    assert (a, c) == (["a"], ["c"])
+    assert isinstance(b, RuntimeError)
+
+
+def test_submit_without_worker_runs_inline():
+    """Test submit falls back to a batch of one when not started"""
+
+    async def batch_fn(payloads):
+        return [p + 1 for p in payloads]
+
+    dispatcher = BatchedDispatcher(batch_fn)
+    assert asyncio.run(dispatcher.submit(1)) == 2
@@ -0,0 +1,67 @@
+"""
+Tests for the endpoint result cache
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+import core.cache as cache
+from core.cache import DEGRADED_HEADER, mark_degraded, redis_cached, result_cache
+from core.responses import ModelJSONResponse
+from schemas.common import FallbackResults
+
+
+def test_local_tier_serves_repeats_without_redis(monkeypatch):
+    """Test repeated requests hit the in-process tier when Redis is absent"""
+    monkeypatch.setattr(cache, "aioredis", None)
+    calls = []
+
+    @redis_cached(prefix="test:local", ttl=60, key_fn=lambda r: r)
+    async def endpoint(request):
+        calls.append(request)
+        return ModelJSONResponse({"query": request})
+
+    async def run():
+        await result_cache.connect()
+        try:
+            return [await endpoint(request=q) for q in ("a", "a", "b")]
+        finally:
+            await result_cache.close()
+
+    first, repeat, other = asyncio.run(run())
+
+    assert calls == ["a", "b"]
+    assert first.headers["X-Cache"] == "MISS"
+    assert repeat.headers["X-Cache"] == "HIT"
+    assert repeat.body == first.body
+    assert other.headers["X-Cache"] == "MISS"
+    assert not result_cache.enabled
+
+
+def test_fallback_results_are_not_cached(monkeypatch):
+    """Test a response built from fallback results is served but not stored"""
+    monkeypatch.setattr(cache, "aioredis", None)
+    calls = []
+
+    @redis_cached(prefix="test:fallback", ttl=60, key_fn=lambda r: r)
+    async def endpoint(request):
+        calls.append(request)
+        results = FallbackResults([{"image_id": "mock_text_0"}])
+        return mark_degraded(ModelJSONResponse({"results": results}), results)
+
+    async def run():
+        await result_cache.connect()
+        try:
+            return [await endpoint(request="a") for _ in range(2)]
+        finally:
+            await result_cache.close()
+
+    first, repeat = asyncio.run(run())
+
+    assert calls == ["a", "a"]
+    for response in (first, repeat):
+        assert response.headers[DEGRADED_HEADER] == "true"
+        assert response.headers["X-Cache"] == "MISS"
@@ -0,0 +1,59 @@
+"""
+Tests for streamed video frame listings
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from api.search import _stream_frames, _stream_frames_ndjson
+
+
+class _FakeMetadataService:
+    def __init__(self, frames):
+        self._frames = frames
+
+    def iter_frames_by_video(self, video_id, limit):
+        yield from self._frames[:limit]
+
+
+def _stream(stream_fn, frames, limit):
+    async def run():
+        service = _FakeMetadataService(frames)
+        return b"".join([c async for c in stream_fn(service, "L21_V001", limit)])
+
+    return asyncio.run(run())
+
+
+def _collect(frames, limit):
+    return json.loads(_stream(_stream_frames, frames, limit))
+
+
+def test_stream_frames_matches_buffered_shape():
+    """Test streamed chunks join into the same document as the cached path"""
+    frames = [{"frame_id": str(i)} for i in range(150)]
+
+    data = _collect(frames, 130)
+
+    assert data["video_id"] == "L21_V001"
+    assert data["frames"] == frames[:130]
+    assert data["total_frames"] == 130
+
+
+def test_stream_frames_empty():
+    """Test an unknown video streams an empty listing"""
+    assert _collect([], 10) == {"video_id": "L21_V001", "frames": [], "total_frames": 0}
+
+
+def test_stream_frames_ndjson_one_frame_per_line():
+    """Test the NDJSON stream emits each frame on its own line"""
+    frames = [{"frame_id": str(i)} for i in range(150)]
+
+    body = _stream(_stream_frames_ndjson, frames, 130)
+
+    assert body.endswith(b"\n")
+    assert [json.loads(line) for line in body.splitlines()] == frames[:130]
+    assert _stream(_stream_frames_ndjson, [], 10) == b""
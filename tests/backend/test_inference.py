@@ -0,0 +1,40 @@
+"""
+Tests for the inference executor pool
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from core.inference import InferencePool
+
+
+def test_run_without_start_is_inline():
+    """Test calls run on the caller's thread before the pool is started"""
+    pool = InferencePool()
+    caller = threading.get_ident()
+
+    assert asyncio.run(pool.run(threading.get_ident)) == caller
+
+
+def test_run_offloads_to_worker_thread():
+    """Test calls run on a pool thread and keyword arguments are passed"""
+
+    def blocking(value, scale=1):
+        return threading.current_thread().name, value * scale
+
+    async def run():
+        pool = InferencePool()
+        pool.start()
+        try:
+            return await pool.run(blocking, 2, scale=3)
+        finally:
+            pool.shutdown()
+
+    thread_name, value = asyncio.run(run())
+
+    assert thread_name.startswith("inf")
+    assert value == 6
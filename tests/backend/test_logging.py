@@ -0,0 +1,65 @@
+"""
+Tests for the queued structured logging setup
+"""
+
+import logging
+import os
+import sys
+
+import orjson
+import pytest
+import structlog
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from core.logging import setup_logging, shutdown_logging
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    """Restore the logging setup replaced by setup_logging()"""
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    try:
+        yield
+    finally:
+        shutdown_logging()
+        root_logger.handlers, root_logger.level = handlers, level
+        structlog.reset_defaults()
+
+
+def _lines(capsys):
+    shutdown_logging()
+    return [orjson.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_exception_traceback_is_logged(capsys):
+    """Test logger.exception keeps the traceback of the active exception"""
+    setup_logging()
+    logger = structlog.get_logger("test")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Search failed")
+
+    (line,) = _lines(capsys)
+
+    assert line["event"] == "Search failed"
+    assert "ValueError: boom" in line["exception"]
+    assert "timestamp" in line
+
+
+def test_stdlib_records_are_rendered(capsys):
+    """Test records from plain stdlib loggers go through the same renderer"""
+    setup_logging()
+    logger = logging.getLogger("test.stdlib")
+    try:
+        raise KeyError("missing")
+    except KeyError:
+        logger.error("Lookup failed", exc_info=True)
+
+    (line,) = _lines(capsys)
+
+    assert line["event"] == "Lookup failed"
+    assert "KeyError" in line["exception"]
+    assert line["timestamp"].endswith("Z")
@@ -0,0 +1,108 @@
+"""
+Tests for the metadata service lookups
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from core.config import settings
+from services.metadata_service import Id2ImgArray, MetadataService, convert_id2img
+
+
+def _service(tmp_path, monkeypatch, id2img, keyframes=None):
+    id2img_path = tmp_path / "id2img.json"
+    id2img_path.write_text(json.dumps(id2img))
+    keyframes_path = tmp_path / "map_keyframes.json"
+    keyframes_path.write_text(json.dumps(keyframes or {}))
+    video_dir = tmp_path / "videos"
+    video_dir.mkdir()
+    for video_id in ("L21_V001", "L21_V002"):
+        (video_dir / f"{video_id}.mp4").touch()
+
+    monkeypatch.setattr(settings, "ID2IMG_JSON_PATH", str(id2img_path))
+    monkeypatch.setattr(settings, "MAP_KEYFRAMES_PATH", str(keyframes_path))
+    monkeypatch.setattr(settings, "VIDEO_DATA_DIR", str(video_dir))
+    monkeypatch.setattr(settings, "KEYFRAME_DATA_DIR", str(tmp_path / "keyframes"))
+    monkeypatch.setattr(
+        settings, "VIDEO_INFO_CACHE_PATH", str(tmp_path / "video_info.cache.json")
+    )
+
+    service = MetadataService()
+    asyncio.run(service.initialize())
+    assert service.is_initialized()
+    return service
+
+
+def test_video_frames_grouped_in_mapping_order(tmp_path, monkeypatch):
+    """Test frames are looked up per video in the order of the mapping file"""
+    id2img = {
+        "0": {"video_id": "L21_V001"},
+        "1": {"video_id": "L21_V002"},
+        "2": {"video_id": "L21_V001"},
+        "3": {"video_id": "L21_V001"},
+    }
+    service = _service(tmp_path, monkeypatch, id2img)
+
+    assert service.get_video_frames("L21_V001") == ["0", "2", "3"]
+    assert service.get_video_frames("L21_V404") == []
+
+    frames = service.search_frames_by_video("L21_V001", limit=2)
+    assert [f["frame_id"] for f in frames] == ["0", "2"]
+    assert frames[0]["video_info"]["filename"] == "L21_V001.mp4"
+
+
+def test_frame_metadata_memoized_and_summary_timestamps(tmp_path, monkeypatch):
+    """Test repeated frame lookups are cached and summaries read keyframe times"""
+    id2img = {"0": {"video_id": "L21_V001"}, "1": {"video_id": "L21_V001"}}
+    keyframes = {"0": {"timestamp": 4.0}, "1": {"timestamp": 1.5}}
+    service = _service(tmp_path, monkeypatch, id2img, keyframes)
+
+    first = service.get_frame_metadata("1")
+    assert service.get_frame_metadata("1") is first
+    assert first["keyframe_info"] == {"timestamp": 1.5}
+
+    summary = service.get_video_summary("L21_V001")
+    assert summary["frame_timestamps"] == [1.5, 4.0]
+    assert summary["duration_estimate"] == 4.0
+
+
+def test_keyframe_path_mapping_and_converted_npy(tmp_path, monkeypatch):
+    """Test id -> keyframe path mappings, parsed or memory-mapped, agree"""
+    id2img = {
+        str(i): f"Keyframes_L21/keyframes/L21_V00{1 + i % 2}/{i:03d}.jpg"
+        for i in range(5)
+    }
+    parsed = _service(tmp_path, monkeypatch, id2img)
+    convert_id2img(settings.ID2IMG_JSON_PATH)
+    mapped = MetadataService()
+    asyncio.run(mapped.initialize())
+
+    assert isinstance(mapped._id2img_mapping, Id2ImgArray)
+    assert mapped._id2img_mapping["3"] == id2img["3"]
+    assert mapped._id2img_mapping.get("03") is None
+    for service in (parsed, mapped):
+        assert service.get_video_frames("L21_V002") == ["1", "3"]
+        frame = service.get_frame_metadata("4")
+        assert frame["video_info"]["filename"] == "L21_V001.mp4"
+
+
+def test_video_info_cached_until_directory_changes(tmp_path, monkeypatch):
+    """Test the video scan is reused while the video directory is unchanged"""
+    service = _service(tmp_path, monkeypatch, {"0": {"video_id": "L21_V001"}})
+    assert sorted(service._video_info) == ["L21_V001", "L21_V002"]
+    assert os.path.exists(settings.VIDEO_INFO_CACHE_PATH)
+
+    def no_scan(path):
+        raise AssertionError(f"unexpected scan of {path}")
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "scandir", no_scan)
+        assert MetadataService()._build_video_info() == service._video_info
+
+    (tmp_path / "videos" / "L21_V003.mp4").touch()
+    rescanned = MetadataService()._build_video_info()
+    assert sorted(rescanned) == ["L21_V001", "L21_V002", "L21_V003"]
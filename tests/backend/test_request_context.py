@@ -0,0 +1,42 @@
+"""
+Tests for the request context middleware
+"""
+
+import os
+import sys
+
+import structlog
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from core.request_context import RequestContextMiddleware
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/context")
+    async def context():
+        return structlog.contextvars.get_contextvars()
+
+    return TestClient(app)
+
+
+def test_request_id_generated_and_bound():
+    """Test a request ID is bound for logging and echoed on the response"""
+    response = _client().get("/context")
+
+    request_id = response.headers["X-Request-ID"]
+    assert len(request_id) == 32
+    assert response.json() == {"request_id": request_id, "path": "/context"}
+
+
+def test_incoming_request_id_is_reused():
+    """Test a caller-supplied X-Request-ID is kept"""
+    response = _client().get("/context", headers={"X-Request-ID": "abc123"})
+
+    assert response.headers["X-Request-ID"] == "abc123"
+    assert response.json()["request_id"] == "abc123"
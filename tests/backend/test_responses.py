@@ -0,0 +1,50 @@
+"""
+Tests for pre-serialized JSON response helpers
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from core.responses import ModelJSONResponse, etag_matches, static_json
+from schemas.asr import ASRData, ASRTranscript
+
+
+def test_etag_matches_exact():
+    """Test a strong ETag matches itself"""
+    assert etag_matches('"abc"', '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+
+
+def test_etag_matches_list_and_weak():
+    """Test lists and weak validators are compared weakly"""
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches('"abc"', 'W/"abc"')
+
+
+def test_etag_matches_wildcard_and_missing():
+    """Test wildcard and missing headers"""
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches("", '"abc"')
+
+
+def test_static_json_is_stable():
+    """Test constant payloads serialize once with a weak, content-based ETag"""
+    content, etag = static_json({"models": [{"id": "clip"}]})
+    assert content == b'{"models":[{"id":"clip"}]}'
+    assert etag.startswith('W/"')
+    assert static_json({"models": [{"id": "clip"}]})[1] == etag
+
+
+def test_model_json_response_encodes_nested_models():
+    """Test models and numpy values are encoded without model_dump()"""
+    data = ASRData(transcript=[ASRTranscript(text="xin chao")], full_text="xin chao")
+
+    body = ModelJSONResponse({"data": data, "score": np.float32(0.5)}).body
+
+    assert body.startswith(b'{"data":{"transcript":[{"text":"xin chao"')
+    assert body.endswith(b'"score":0.5}')
@@ -0,0 +1,123 @@
+"""
+Tests for multi-model result fusion
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from core.config import settings
+from schemas.common import SearchResult
+from services.result_fusion import ResultFusionService
+
+
+def _results(model, links_scores):
+    return [
+        SearchResult(
+            image_id=f"{model}_{link}",
+            score=score,
+            link=link,
+            file_path=f"L21_V001/{link}.jpg",
+        )
+        for link, score in links_scores
+    ]
+
+
+MODEL_RESULTS = {
+    "clip": _results("clip", [("a", 0.9), ("b", 0.8), ("c", 0.7)]),
+    "beit3": _results("beit3", [("b", 0.95), ("d", 0.6), ("a", 0.5)]),
+}
+
+
+@pytest.fixture(autouse=True)
+def _fusion_settings(monkeypatch):
+    """Pin the settings the expected orderings depend on"""
+    monkeypatch.setattr(settings, "ENABLE_DUPLICATE_REMOVAL", True)
+    monkeypatch.setattr(
+        settings, "MODEL_PRIORITIES", {"clip": 1, "longclip": 2, "clip2video": 3}
+    )
+
+
+def _fuse(method, limit=10):
+    return ResultFusionService().fuse_results(MODEL_RESULTS, limit, method=method)
+
+
+def test_reciprocal_rank_fusion_scores_and_order():
+    """Test RRF sums 1 / (60 + rank) per link and keeps the first-seen result"""
+    fused = _fuse("reciprocal_rank")
+
+    assert [r.link for r in fused] == ["b", "a", "d", "c"]
+    assert fused[0].score == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[0].image_id == "clip_b"
+    assert fused[0].file_path == "L21_V001/b.jpg"
+
+
+@pytest.mark.parametrize(
+    "method, expected",
+    [
+        ("score", ["b", "a", "c", "d"]),
+        ("rank", ["b", "a", "d", "c"]),
+        ("borda", ["b", "a", "d", "c"]),
+        ("weighted", ["b", "a", "c", "d"]),
+    ],
+)
+def test_fusion_methods_rank_shared_links_first(method, expected):
+    """Test each fusion method orders the fused links by its combined score"""
+    fused = _fuse(method)
+
+    assert [r.link for r in fused] == expected
+    assert all(r.file_path == f"L21_V001/{r.link}.jpg" for r in fused)
+
+
+def test_fusion_respects_limit_and_leaves_inputs_untouched():
+    """Test fused lists are cut to the limit without rescoring the inputs"""
+    fused = _fuse("borda", limit=2)
+
+    assert [r.link for r in fused] == ["b", "a"]
+    assert fused[0].score == 5.0
+    assert [r.score for r in MODEL_RESULTS["clip"]] == [0.9, 0.8, 0.7]
+
+
+@pytest.mark.parametrize(
+    "method", ["score", "rank", "reciprocal_rank", "weighted", "borda"]
+)
+def test_zero_limit_returns_nothing(method):
+    """Test a zero limit yields no results for every fusion method"""
+    assert _fuse(method, limit=0) == []
+
+
+def test_score_fusion_fills_limit_with_unique_links():
+    """Test score fusion drops a link's weaker duplicates before cutting to limit"""
+    fused = _fuse("score", limit=3)
+
+    assert [(r.link, r.score) for r in fused] == [("b", 0.95), ("a", 0.9), ("c", 0.7)]
+
+
+def test_fusion_stats_per_model():
+    """Test per-model stats summarize each model's scores"""
+    stats = ResultFusionService().get_fusion_stats({**MODEL_RESULTS, "ocr": []})
+
+    assert stats["total_models"] == 3
+    assert stats["total_results"] == 6
+    assert stats["model_breakdown"]["clip"] == {
+        "result_count": 3,
+        "avg_score": pytest.approx(0.8),
+        "min_score": 0.7,
+        "max_score": 0.9,
+    }
+    assert stats["model_breakdown"]["ocr"]["result_count"] == 0
+
+
+def test_single_non_empty_model_skips_fusion():
+    """Test results pass through untouched when the other models found nothing"""
+    service = ResultFusionService()
+    clip = MODEL_RESULTS["clip"]
+
+    fused = service.fuse_results({"clip": clip, "beit3": []}, 2, method="borda")
+
+    assert fused == clip[:2]
+    assert fused[0] is clip[0]
+    assert service.fuse_results({"clip": [], "beit3": []}, 2) == []
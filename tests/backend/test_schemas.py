@@ -0,0 +1,50 @@
+"""
+Tests for request schema configuration
+"""
+
+import os
+import sys
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "backend"))
+
+from schemas.asr import ASRData, ASRMetadata, build_asr_response
+from schemas.common import ModelType, SearchResult
+from schemas.search import SearchResponse, TextSearchRequest, build_search_response
+
+
+def test_request_ignores_unknown_fields():
+    """Test extra fields in a request body are dropped rather than rejected"""
+    request = TextSearchRequest(query="a dog", model_type="beit3", debug=True)
+
+    assert request.model_type is ModelType.BEIT3
+    assert "debug" not in request.model_dump()
+
+
+def test_request_is_frozen():
+    """Test validated requests cannot be mutated downstream"""
+    request = TextSearchRequest(query="a dog")
+
+    with pytest.raises(ValidationError):
+        request.limit = 50
+
+
+def test_built_search_payload_matches_response_model():
+    """Test the documented response model describes what endpoints return"""
+    results = [SearchResult(image_id="L21_V001/001", score=0.9)]
+    payload = build_search_response(results, 1.5, "clip", "text")
+
+    response = SearchResponse.model_validate(payload)
+
+    assert response.data.results == results
+    assert response.metadata.total_results == 1
+
+
+def test_built_asr_metadata_has_only_declared_fields():
+    """Test the ASR payload metadata carries exactly the ASRMetadata fields"""
+    result = ASRData(transcript=[], full_text="")
+    payload = build_asr_response(result, 2.0, asr_engine="whisper")
+
+    assert set(payload["metadata"]) == set(ASRMetadata.model_fields)
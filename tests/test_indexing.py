@@ -2,6 +2,7 @@
 Tests for the video indexing pipeline
 """
 
+import json
 import os
 
 # Add backend to path
@@ -9,12 +10,13 @@ import sys
 import tempfile
 from pathlib import Path
 
+import faiss
 import numpy as np
 import pytest
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
 
-from indexer.faiss_index import FAISSIndex
+from indexer.faiss_index import FAISSIndex, MetadataColumns
 from indexer.hdf5_storage import HDF5Storage, create_hdf5_file
 from indexer.lucene_index import LuceneIndex
 
@@ -110,6 +112,136 @@ class TestFAISSIndex:
         assert len(results) == 5
         assert faiss_index.is_trained
 
+    def test_faiss_ivfpq_index_with_opq(self):
+        """Test IVFPQ index builds behind OPQ and trains on a sample"""
+        features = np.random.randn(3000, 128).astype(np.float32)
+        metadata = [{"id": i} for i in range(3000)]
+
+        faiss_index = FAISSIndex()
+        faiss_index.build_index(
+            features.copy(), metadata, index_type="ivfpq", nlist=4, m=8
+        )
+
+        stats = faiss_index.get_stats()
+        assert stats["index_type"] == "IndexIDMap2"
+        assert stats["nlist"] == 4
+        assert stats["total_vectors"] == 3000
+
+        scores, indices, results = faiss_index.search(features[:1].copy(), k=5)
+        assert len(indices) == 5
+        assert results[0] == {"id": int(indices[0])}
+
+    def test_faiss_hnsw_index(self):
+        """Test HNSW index builds without training and finds exact matches"""
+        features = np.random.randn(500, 64).astype(np.float32)
+        metadata = [{"id": i} for i in range(500)]
+
+        faiss_index = FAISSIndex()
+        faiss_index.build_index(features.copy(), metadata, index_type="hnsw", M=16)
+        faiss_index.set_ef_search(128)
+
+        scores, indices, results = faiss_index.search(features[7].copy(), k=3)
+        assert indices[0] == 7
+        assert results[0] == {"id": 7}
+
+    def test_faiss_hnsw_remove_vectors_is_skipped(self):
+        """Test removing from an HNSW index warns and leaves it untouched"""
+        features = np.random.randn(100, 32).astype(np.float32)
+        metadata = [{"id": i} for i in range(100)]
+
+        faiss_index = FAISSIndex()
+        faiss_index.build_index(features.copy(), metadata, index_type="hnsw", M=16)
+        faiss_index.remove_vectors([1, 2, 3])
+
+        assert faiss_index.index.ntotal == 100
+        scores, indices, results = faiss_index.search(features[2].copy(), k=1)
+        assert indices[0] == 2
+
+    @pytest.mark.parametrize("index_type", ["hnsw", "sq8", "fp16"])
+    def test_faiss_gpu_clone_is_skipped_without_gpu_version(
+        self, monkeypatch, index_type
+    ):
+        """Test use_gpu keeps index types with no FAISS GPU version on CPU"""
+
+        def index_cpu_to_gpu(*args):
+            raise RuntimeError("not implemented for this type of index")
+
+        monkeypatch.setattr(faiss, "get_num_gpus", lambda: 1)
+        monkeypatch.setattr(faiss, "StandardGpuResources", object, raising=False)
+        monkeypatch.setattr(faiss, "GpuClonerOptions", object, raising=False)
+        monkeypatch.setattr(faiss, "index_cpu_to_gpu", index_cpu_to_gpu, raising=False)
+
+        features = np.random.randn(300, 32).astype(np.float32)
+        metadata = [{"id": i} for i in range(300)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_path = os.path.join(temp_dir, "test.index")
+            metadata_path = os.path.join(temp_dir, "test.json")
+
+            faiss_index = FAISSIndex(index_path, metadata_path)
+            faiss_index.build_index(
+                features.copy(), metadata, index_type=index_type, use_gpu=True
+            )
+            assert not faiss_index.on_gpu
+            faiss_index.save_index()
+
+            loaded_index = FAISSIndex(index_path, metadata_path)
+            loaded_index.load_index(use_gpu=True)
+            assert not loaded_index.on_gpu
+            scores, indices, results = loaded_index.search(features[5].copy(), k=1)
+            assert indices[0] == 5
+
+    def test_faiss_sq8_index(self):
+        """Test scalar-quantized index stores compact codes and finds matches"""
+        features = np.random.randn(500, 64).astype(np.float32)
+        metadata = [{"id": i} for i in range(500)]
+
+        faiss_index = FAISSIndex()
+        faiss_index.build_index(features.copy(), metadata, index_type="sq8")
+
+        assert faiss.downcast_index(faiss_index.index.index).code_size == 64
+        scores, indices, results = faiss_index.search(features[7].copy(), k=3)
+        assert indices[0] == 7
+        assert results[0] == {"id": 7}
+
+    def test_faiss_chunked_build_matches_in_memory_build(self):
+        """Test building in chunks gives the same flat index as one add"""
+        features = np.random.randn(300, 32).astype(np.float32)
+        metadata = [{"id": i} for i in range(300)]
+
+        in_memory = FAISSIndex()
+        in_memory.build_index(features.copy(), metadata)
+        chunked = FAISSIndex()
+        chunked.build_index_chunked(
+            features, MetadataColumns.from_records(metadata), chunk_size=64
+        )
+
+        query = np.random.randn(2, 32).astype(np.float32)
+        expected = in_memory.search_batch(query, k=5)
+        scores, indices, results = chunked.search_batch(query, k=5)
+        assert chunked.index.ntotal == 300
+        assert indices.tolist() == expected[1].tolist()
+        assert results == expected[2]
+
+    def test_faiss_search_batch_matches_single_queries(self):
+        """Test a batched search returns the same hits as one search per query"""
+        features = np.random.randn(200, 64).astype(np.float32)
+        metadata = [{"id": i} for i in range(200)]
+
+        faiss_index = FAISSIndex()
+        faiss_index.build_index(features.copy(), metadata)
+
+        queries = np.random.randn(3, 64).astype(np.float64)
+        scores, indices, results = faiss_index.search_batch(queries, k=4)
+
+        assert scores.shape == indices.shape == (3, 4)
+        for q, row, row_results in zip(queries, indices, results):
+            _, single_indices, single_results = faiss_index.search(
+                q.astype(np.float32), k=4
+            )
+            assert row.tolist() == single_indices.tolist()
+            assert row_results == single_results
+
     def test_faiss_index_save_load(self):
         """Test FAISS index save and load"""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -137,6 +269,51 @@ class TestFAISSIndex:
             assert len(scores) == 3
             assert loaded_index.is_trained
 
+    def test_faiss_metadata_columns_round_trip(self):
+        """Test metadata round-trips memory-mapped and survives removals"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            features = np.eye(4, 8, dtype=np.float32)
+            metadata = [
+                {"video_id": f"L21_V00{i}", "frame_id": f"{i:03d}", "shot_id": i}
+                for i in range(4)
+            ]
+
+            faiss_index = FAISSIndex()
+            faiss_index.build_index(features.copy(), metadata)
+            faiss_index.remove_vectors([1])
+
+            index_path = os.path.join(temp_dir, "index.bin")
+            metadata_path = os.path.join(temp_dir, "metadata.npy")
+            faiss_index.save_index(index_path, metadata_path)
+
+            loaded_index = FAISSIndex()
+            loaded_index.load_index(index_path, metadata_path)
+            assert loaded_index.metadata.columns["shot_id"].dtype == np.int64
+            assert isinstance(loaded_index.metadata.columns["shot_id"], np.memmap)
+
+            _, indices, results = loaded_index.search(features[2].copy(), k=3)
+            assert indices[0] == 2
+            assert results[0] == metadata[2]
+            assert 1 not in indices
+
+    def test_faiss_load_legacy_json_metadata(self):
+        """Test metadata saved as the old str-keyed JSON still loads"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            features = np.eye(3, 8, dtype=np.float32)
+            faiss_index = FAISSIndex()
+            faiss_index.build_index(features.copy(), [{"id": i} for i in range(3)])
+
+            index_path = os.path.join(temp_dir, "index.bin")
+            metadata_path = os.path.join(temp_dir, "metadata.json")
+            faiss_index.save_index(index_path, os.path.join(temp_dir, "unused.npz"))
+            with open(metadata_path, "w") as f:
+                json.dump({str(i): {"id": i} for i in range(3)}, f)
+
+            loaded_index = FAISSIndex()
+            loaded_index.load_index(index_path, metadata_path)
+            _, indices, results = loaded_index.search(features[1].copy(), k=1)
+            assert results == [{"id": 1}]
+
 
 class TestLuceneIndex:
     """Test Lucene/Whoosh index functionality"""